@@ -0,0 +1,227 @@
+"""
+Batch Scoring
+-------------
+Corridor x keyword-class x document count matrix, scored with NumPy
+
+Building the matrix runs the text work once (corridor extraction, mention
+and keyword windows, timelines). Everything after that - weights, the
+frequency bonus, the 100-point cap, the MIN_SIGNAL_STRENGTH threshold and the
+total/average aggregation - is vectorized, so calibration sweeps over many
+weight sets take seconds instead of full reruns:
+
+    matrix = ScoreMatrix.build(tracker, documents, workers=8)
+    ranked = matrix.ranked()                        # same totals as analyze_documents
+    ranked = matrix.ranked({'high_signal': 12, 'medium_signal': 4, 'infrastructure': 8})
+    totals = matrix.sweep(weight_grid)              # (weight sets x corridors)
+
+Only corridor/document pairs that occur are stored (a sparse layout), since
+most corridors appear in a handful of documents.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+import municipal_rezoning_tracker
+from municipal_rezoning_tracker import (MIN_SIGNAL_STRENGTH, CorridorAggregator, KeywordIndex,
+                                        _init_worker)
+
+# Timeline category <-> priority code (lower is more urgent)
+TIMELINES = sorted(CorridorAggregator.TIMELINE_PRIORITY,
+                   key=CorridorAggregator.TIMELINE_PRIORITY.get)
+
+
+def document_score_rows(tracker, text):
+    """
+    Scoring inputs for every corridor in a document:
+    list of (corridor, class counts in tracker.keyword_weights order,
+    mention count, timeline)
+    """
+    corridors = tracker.extract_corridors(text)
+    mention_index = tracker.build_mention_index(text, corridors)
+    keyword_index = KeywordIndex(text, tracker.intent_keywords, tracker.patterns.keyword_scanner)
+    categories = list(tracker.keyword_weights)
+    
+    rows = []
+    for corridor in corridors:
+        mentions = mention_index[corridor]
+        if not mentions:
+            continue
+        class_counts = tracker.keyword_class_counts(text, mentions, keyword_index)
+        # Every corridor gets a timeline, since any weight set may let it pass
+        timeline = tracker.extract_timeline_signals(text, corridor, mentions)
+        rows.append((corridor, [class_counts.get(c, 0) for c in categories],
+                     len(mentions), timeline))
+    return rows
+
+
+def _rows_in_worker(text):
+    return document_score_rows(municipal_rezoning_tracker._worker_tracker, text)
+
+
+class ScoreMatrix:
+    """
+    Sparse corridor x keyword-class x document counts
+    
+    One row per (document, corridor) pair: `doc` and `corridor` index into
+    `documents` and `corridors`, `counts` has one column per category,
+    `mentions` is the mention count and `timeline` the priority code.
+    """
+    
+    def __init__(self, categories, default_weights, corridors, documents,
+                 doc, corridor, counts, mentions, timeline):
+        self.categories = list(categories)
+        self.default_weights = dict(default_weights)
+        self.corridors = list(corridors)
+        self.documents = list(documents)
+        self.doc = doc
+        self.corridor = corridor
+        self.counts = counts
+        self.mentions = mentions
+        self.timeline = timeline
+    
+    @classmethod
+    def build(cls, tracker, documents, workers=None, batch_size=256):
+        """
+        Run the text stage over documents (dicts with 'text', 'name', 'date')
+        With workers set, documents are processed by a process pool
+        """
+        categories = list(tracker.keyword_weights)
+        priority = CorridorAggregator.TIMELINE_PRIORITY
+        names = []
+        raw_doc, raw_corridor, raw_counts, raw_mentions, raw_timeline = [], [], [], [], []
+        corridor_ids = {}
+        
+        pool = None
+        if workers is not None and workers > 1:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                       initargs=(tracker,))
+        try:
+            documents = iter(documents)
+            while True:
+                batch = list(islice(documents, batch_size if pool is not None else 1))
+                if not batch:
+                    break
+                texts = [doc['text'] for doc in batch]
+                if pool is not None:
+                    results = pool.map(_rows_in_worker, texts,
+                                       chunksize=max(1, len(texts) // (workers * 4)))
+                else:
+                    results = (document_score_rows(tracker, text) for text in texts)
+                
+                for doc, rows in zip(batch, results):
+                    doc_id = len(names)
+                    names.append({'name': doc['name'], 'date': doc['date']})
+                    for corridor, counts, mention_count, timeline in rows:
+                        raw_doc.append(doc_id)
+                        raw_corridor.append(corridor_ids.setdefault(corridor, len(corridor_ids)))
+                        raw_counts.append(counts)
+                        raw_mentions.append(mention_count)
+                        raw_timeline.append(priority.get(timeline, 4))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        
+        # Number corridors alphabetically, so index order is the tie-break order
+        corridors = sorted(corridor_ids)
+        renumber = np.empty(len(corridors), dtype=np.int32)
+        for new_id, corridor in enumerate(corridors):
+            renumber[corridor_ids[corridor]] = new_id
+        
+        return cls(
+            categories, tracker.keyword_weights, corridors, names,
+            doc=np.asarray(raw_doc, dtype=np.int32),
+            corridor=renumber[np.asarray(raw_corridor, dtype=np.int32)],
+            counts=np.asarray(raw_counts, dtype=np.int32).reshape(-1, len(categories)),
+            mentions=np.asarray(raw_mentions, dtype=np.int32),
+            timeline=np.asarray(raw_timeline, dtype=np.int8)
+        )
+    
+    def __len__(self):
+        return len(self.doc)
+    
+    def weight_matrix(self, weights=None):
+        """
+        Weights as a (categories x weight sets) array
+        Accepts None (the tracker's weights), one dict, or a list of dicts
+        """
+        if weights is None:
+            weights = self.default_weights
+        if isinstance(weights, dict):
+            weights = [weights]
+        return np.array([[w.get(c, 0) for w in weights] for c in self.categories]
+                        ).reshape(len(self.categories), len(weights))
+    
+    def scores(self, weights=None):
+        """Per-row signal strength, (rows x weight sets)"""
+        w = self.weight_matrix(weights)
+        score = self.counts @ w
+        # Frequency bonus (capped at 20), then the overall cap at 100
+        score += np.minimum(self.mentions * 3, 20)[:, None]
+        return np.minimum(score, 100)
+    
+    def aggregate(self, weights=None, threshold=MIN_SIGNAL_STRENGTH):
+        """
+        Per-corridor totals under each weight set
+        Returns dict of (weight sets x corridors) arrays: total_score,
+        num_mentions, avg_score (NaN where a corridor never passed) and
+        timeline (priority code, 5 where it never passed)
+        """
+        scores = self.scores(weights)
+        passed = scores >= threshold
+        n_sets = scores.shape[1]
+        n_corridors = len(self.corridors)
+        
+        total = np.zeros((n_sets, n_corridors), dtype=scores.dtype)
+        num = np.zeros((n_sets, n_corridors), dtype=np.int64)
+        timeline = np.full((n_sets, n_corridors), 5, dtype=np.int8)
+        for s in range(n_sets):
+            mask = passed[:, s]
+            kept = self.corridor[mask]
+            total[s] = np.bincount(kept, weights=scores[mask, s], minlength=n_corridors)
+            num[s] = np.bincount(kept, minlength=n_corridors)
+            np.minimum.at(timeline[s], kept, self.timeline[mask])
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            avg = total / num
+        return {'total_score': total, 'num_mentions': num, 'avg_score': avg, 'timeline': timeline}
+    
+    def sweep(self, weight_sets, threshold=MIN_SIGNAL_STRENGTH):
+        """Total score of every corridor under every weight set (sets x corridors)"""
+        return self.aggregate(weight_sets, threshold)['total_score']
+    
+    def ranked(self, weights=None, threshold=MIN_SIGNAL_STRENGTH, top_n=None):
+        """
+        Ranking under one weight set, like analyze_documents without the
+        documents and evidence lists (those need the text)
+        """
+        agg = self.aggregate(weights, threshold)
+        total = agg['total_score'][0]
+        num = agg['num_mentions'][0]
+        # Corridor ids are alphabetical, so a stable sort breaks ties by name
+        order = np.argsort(-total, kind='stable')
+        order = order[num[order] > 0]
+        if top_n is not None:
+            order = order[:top_n]
+        
+        return [
+            {
+                'corridor': self.corridors[i],
+                'total_score': total[i].item(),
+                'avg_score': agg['avg_score'][0, i].item(),
+                'num_mentions': num[i].item(),
+                'timeline': TIMELINES[agg['timeline'][0, i] - 1]
+            }
+            for i in order
+        ]
+    
+    def to_dense(self):
+        """
+        Dense (corridors x categories x documents) count array
+        Only sensible for small corpora
+        """
+        dense = np.zeros((len(self.corridors), len(self.categories), len(self.documents)),
+                         dtype=self.counts.dtype)
+        dense[self.corridor, :, self.doc] = self.counts
+        return dense
@@ -0,0 +1,333 @@
+"""
+Benchmark Suite
+---------------
+Measures tracker throughput on a deterministic synthetic corpus
+
+The corpus generator recombines sentences from the sample planning
+documents with a scalable pool of corridor names, so documents read like
+real plan text while the corpus grows from 10 to 100k documents.
+
+For every corpus size each stage reports docs/sec, MB/sec and the peak RSS
+reached during that stage (and how far it rose above the RSS at the start);
+results are saved as JSON so runs from different versions can be compared:
+
+    python benchmark.py --sizes 10 1000 10000 --output bench_new.json
+    python benchmark.py --sizes 10 1000 --compare bench_old.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from municipal_rezoning_tracker import (ANALYSIS_VERSION, MIN_SIGNAL_STRENGTH, KeywordIndex,
+                                        MunicipalRezoningTracker)
+from sample_planning_documents import SAMPLE_DOCUMENTS
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+CORRIDOR_NAME = re.compile(
+    r'\b(?:[A-Z][a-z]+\s+){0,2}[A-Z][a-z]+\s+(?:Street|Road|Boulevard|Avenue|Drive|Parkway)\b'
+)
+
+STREET_STEMS = [
+    'Oak', 'Maple', 'Cedar', 'Sugar Creek', 'Beatties Ford', 'Monroe', 'Tuckaseegee',
+    'Freedom', 'Providence', 'Rea', 'Mallard Creek', 'Nations Ford', 'Arrowood',
+    'Brookshire', 'Harris', 'Sardis', 'Idlewild', 'Milton', 'Plaza', 'Shamrock'
+]
+STREET_SUFFIXES = ['Street', 'Road', 'Boulevard', 'Avenue', 'Drive', 'Parkway']
+DIRECTIONS = ['', 'North ', 'South ', 'East ', 'West ']
+STEM_SYLLABLES = ['bac', 'def', 'gil', 'hom', 'kan', 'lor', 'mit', 'nev', 'pos', 'ruk',
+                  'sab', 'tel', 'vin', 'wod', 'yar', 'zum']
+
+STAGES = ['extract_corridors', 'score_corridors', 'timeline_evidence',
+          'analyze_documents', 'generate_report', 'export_to_csv', 'to_dataframe']
+
+
+def _sample_sentences():
+    """Sentences of the sample documents with corridor names swapped for a slot"""
+    sentences = []
+    for doc in SAMPLE_DOCUMENTS:
+        text = ' '.join(doc['text'].split())
+        for sentence in re.split(r'(?<=[.:])\s+', text):
+            if len(sentence) > 30:
+                sentences.append(CORRIDOR_NAME.sub('{corridor}', sentence))
+    return sentences
+
+
+def numbered_stem(n):
+    """
+    A distinct capitalized street stem for every n >= 0 ("Bac", "Bacdef", ...),
+    spelled with fixed-width syllables so corridor patterns still match it
+    """
+    syllables = []
+    while True:
+        n, digit = divmod(n, len(STEM_SYLLABLES))
+        syllables.append(STEM_SYLLABLES[digit])
+        if not n:
+            break
+    return ''.join(reversed(syllables)).capitalize()
+
+
+def corridor_pool(size, seed=0):
+    """Deterministic list of distinct corridor names, of any size"""
+    rng = random.Random(seed)
+    names = []
+    seen = set()
+    numbered = 0
+    while len(names) < size:
+        name = (rng.choice(DIRECTIONS) + rng.choice(STREET_STEMS) + ' '
+                + rng.choice(STREET_SUFFIXES))
+        if name in seen:
+            # Extra distinct names once the simple combinations run out
+            name = f"{rng.choice(STREET_STEMS)} {rng.choice(STREET_STEMS)} {rng.choice(STREET_SUFFIXES)}"
+        if name in seen:
+            # Numbered stems never run out, so any pool size can be filled
+            name = f"{numbered_stem(numbered)} {rng.choice(STREET_SUFFIXES)}"
+            numbered += 1
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+
+def generate_corpus(n_docs, seed=0, min_sentences=20, max_sentences=120):
+    """
+    Deterministic synthetic corpus of n_docs tracker documents
+    The corridor pool grows with the corpus so rankings stay realistic
+    """
+    rng = random.Random(seed)
+    sentences = _sample_sentences()
+    corridors = corridor_pool(max(20, int(n_docs ** 0.5) * 10), seed)
+    documents = []
+    for i in range(n_docs):
+        # Each document focuses on a handful of corridors, like a real plan
+        focus = rng.sample(corridors, rng.randint(2, 6))
+        parts = []
+        for _ in range(rng.randint(min_sentences, max_sentences)):
+            sentence = rng.choice(sentences)
+            while '{corridor}' in sentence:
+                sentence = sentence.replace('{corridor}', rng.choice(focus), 1)
+            parts.append(sentence)
+        day = datetime(2023, 1, 1).toordinal() + rng.randint(0, 730)
+        documents.append({
+            'text': ' '.join(parts),
+            'name': f'Synthetic Planning Document {i:06d}',
+            'date': datetime.fromordinal(day).strftime('%Y-%m-%d')
+        })
+    return documents
+
+
+def peak_rss_mb():
+    """Process high-water mark RSS in MB (None where unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def reset_peak_rss():
+    """
+    Reset the high-water mark to the current RSS, so the next peak_rss_mb()
+    covers one stage only. Linux only; returns False where it can't be reset
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _measure(fn, n_docs, n_bytes, trace_memory):
+    # Without a reset the high-water mark spans the whole process, so only
+    # its growth during the stage can be attributed to the stage
+    own_peak = reset_peak_rss()
+    rss_before = peak_rss_mb()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    rss_after = peak_rss_mb()
+    stats = {
+        'seconds': round(seconds, 4),
+        'docs_per_sec': round(n_docs / seconds, 1) if seconds else None,
+        'mb_per_sec': round(n_bytes / 1e6 / seconds, 2) if seconds else None,
+        'peak_rss_mb': rss_after if own_peak else None,
+        'peak_rss_growth_mb': (round(rss_after - rss_before, 1)
+                               if rss_after is not None else None)
+    }
+    if trace_memory:
+        stats['peak_traced_mb'] = round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+        tracemalloc.stop()
+    return stats, result
+
+
+def run_size(n_docs, seed=0, workers=None, trace_memory=False):
+    """Benchmark every stage on a corpus of n_docs documents"""
+    tracker = MunicipalRezoningTracker()
+    documents = generate_corpus(n_docs, seed)
+    n_bytes = sum(len(doc['text'].encode('utf-8')) for doc in documents)
+    results = {'documents': n_docs, 'megabytes': round(n_bytes / 1e6, 3), 'stages': {}}
+    
+    def extract():
+        return [tracker.extract_corridors(doc['text']) for doc in documents]
+    
+    stats, corridor_lists = _measure(extract, n_docs, n_bytes, trace_memory)
+    results['stages']['extract_corridors'] = stats
+    
+    def score():
+        indexes = []
+        for doc, corridors in zip(documents, corridor_lists):
+            text = doc['text']
+            mentions = tracker.build_mention_index(text, corridors)
+            keywords = KeywordIndex(text, tracker.intent_keywords,
+                                    tracker.patterns.keyword_scanner)
+            scores = {c: tracker.calculate_signal_strength(text, c, mentions[c], keywords)
+                      for c in corridors}
+            indexes.append((mentions, scores))
+        return indexes
+    
+    stats, scored = _measure(score, n_docs, n_bytes, trace_memory)
+    results['stages']['score_corridors'] = stats
+    
+    def timeline_evidence():
+        for doc, (mentions, scores) in zip(documents, scored):
+            for corridor, score in scores.items():
+                if score >= MIN_SIGNAL_STRENGTH:
+                    tracker.extract_timeline_signals(doc['text'], corridor, mentions[corridor])
+                    tracker.evidence_spans(doc['text'], mentions[corridor], max_quotes=2)
+    
+    stats, _ = _measure(timeline_evidence, n_docs, n_bytes, trace_memory)
+    results['stages']['timeline_evidence'] = stats
+    del corridor_lists, scored
+    
+    stats, ranked = _measure(lambda: tracker.analyze_documents(documents, workers=workers),
+                             n_docs, n_bytes, trace_memory)
+    results['stages']['analyze_documents'] = stats
+    results['corridors_ranked'] = len(ranked)
+    
+    stats, _ = _measure(lambda: tracker.generate_report(ranked, top_n=10),
+                        n_docs, n_bytes, trace_memory)
+    results['stages']['generate_report'] = stats
+    
+    # Only the CSV writing; DataFrame construction is its own stage below
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'bench.csv')
+        stats, _ = _measure(lambda: tracker.export_to_csv(ranked, csv_path, as_dataframe=False),
+                            n_docs, n_bytes, trace_memory)
+    results['stages']['export_to_csv'] = stats
+    
+    # pandas is optional and imported on first use; import it before the
+    # clock starts so the stage measures building the frame, not the import
+    try:
+        import pandas  # noqa: F401
+    except ImportError:
+        pandas = None
+    if pandas is not None:
+        rows = [tracker.csv_row(opp) for opp in ranked]
+        stats, _ = _measure(lambda: tracker.to_dataframe(rows), n_docs, n_bytes, trace_memory)
+        results['stages']['to_dataframe'] = stats
+    
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+                              ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_benchmarks(sizes, seed=0, workers=None, trace_memory=False):
+    """Benchmark every corpus size; returns the JSON-ready report"""
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'analysis_version': ANALYSIS_VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': seed,
+        'workers': workers,
+        'runs': []
+    }
+    for n_docs in sizes:
+        print(f"Benchmarking {n_docs:,} documents...", flush=True)
+        run = run_size(n_docs, seed, workers, trace_memory)
+        report['runs'].append(run)
+        print(format_run(run))
+    return report
+
+
+def format_run(run):
+    lines = [f"  {run['documents']:,} docs, {run['megabytes']} MB, "
+             f"{run['corridors_ranked']:,} corridors ranked"]
+    for stage in STAGES:
+        s = run['stages'].get(stage)
+        if s is None:
+            continue
+        lines.append(f"    {stage:<20} {s['seconds']:>9.3f}s {s['docs_per_sec'] or 0:>11,.1f} docs/s "
+                     f"{s['mb_per_sec'] or 0:>8.2f} MB/s  peak RSS {s['peak_rss_mb']} MB "
+                     f"(+{s.get('peak_rss_growth_mb')} MB)")
+    return '\n'.join(lines)
+
+
+def compare(report, baseline):
+    """Print per-stage speed ratios against an earlier report (>1 = faster now)"""
+    old_runs = {run['documents']: run for run in baseline['runs']}
+    print(f"\nComparison with {baseline.get('commit') or 'baseline'} "
+          f"({baseline.get('timestamp')}):")
+    for run in report['runs']:
+        old = old_runs.get(run['documents'])
+        if old is None:
+            continue
+        print(f"  {run['documents']:,} docs")
+        for stage in STAGES:
+            new_s = run['stages'].get(stage, {}).get('seconds')
+            old_s = old['stages'].get(stage, {}).get('seconds')
+            if new_s and old_s:
+                ratio = old_s / new_s
+                flag = '  <-- regression' if ratio < 0.9 else ''
+                print(f"    {stage:<20} {ratio:6.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the municipal rezoning tracker')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000],
+                        help='corpus sizes in documents (10 to 100000)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='processes for the analyze_documents stage')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='also report per-stage peak Python allocations (slower)')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help='earlier results JSON to compare against')
+    args = parser.parse_args()
+    
+    report = run_benchmarks(args.sizes, args.seed, args.workers, args.trace_memory)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to: {args.output}")
+    
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Corridor Gazetteer
+------------------
+Known street and area names for a city, compiled into a word trie
+
+With a gazetteer, MunicipalRezoningTracker.extract_corridors finds every
+known corridor in one linear pass over the document's words and reports
+each under its canonical name ("N Tryon St", "North Tryon Street Corridor"
+-> "North Tryon Street"). The regex patterns still run as a fallback for
+names the gazetteer does not contain.
+
+Gazetteer files are JSON ({"Canonical Name": ["alias", ...]}) or CSV with
+canonical,alias rows (a header row is optional).
+"""
+
+import csv
+import json
+import re
+
+# Words that turn a street into an area ("X Corridor") without naming a new place
+GENERIC_SUFFIXES = {'corridor', 'area', 'district', 'neighborhood'}
+
+WORD_PATTERN = re.compile(r"[A-Za-z0-9]+(?:['\-][A-Za-z0-9]+)*\.?")
+
+# Marks the end of a complete name in the trie
+_END = ''
+
+
+def normalize_words(name):
+    """Lowercase words of a name, without abbreviation periods"""
+    return [word.lower().rstrip('.') for word in WORD_PATTERN.findall(name)]
+
+
+class CorridorGazetteer:
+    """
+    Canonical corridor names and their aliases, matched word by word
+    
+    Usage:
+        gazetteer = CorridorGazetteer.load('charlotte_gazetteer.json')
+        tracker = MunicipalRezoningTracker(gazetteer=gazetteer)
+    """
+    
+    def __init__(self, entries):
+        # canonical name -> list of surface forms (the canonical name included)
+        self.entries = {}
+        self._canonical = {}
+        self._trie = {}
+        
+        for canonical, aliases in entries.items():
+            forms = [canonical] + [a for a in aliases if a != canonical]
+            self.entries[canonical] = forms
+            for form in forms:
+                words = normalize_words(form)
+                if not words:
+                    continue
+                self._canonical.setdefault(' '.join(words), canonical)
+                node = self._trie
+                for word in words:
+                    node = node.setdefault(word, {})
+                node.setdefault(_END, canonical)
+    
+    @classmethod
+    def load(cls, path):
+        """Read a gazetteer from a .json or .csv file"""
+        if path.lower().endswith('.json'):
+            with open(path) as f:
+                return cls(json.load(f))
+        
+        entries = {}
+        with open(path, newline='') as f:
+            for row in csv.reader(f):
+                if not row or row[0].strip().lower() in ('', 'canonical'):
+                    continue
+                aliases = entries.setdefault(row[0].strip(), [])
+                aliases.extend(alias.strip() for alias in row[1:] if alias.strip())
+        return cls(entries)
+    
+    def __contains__(self, canonical):
+        return canonical in self.entries
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def aliases(self, canonical):
+        """Every surface form of a canonical name"""
+        return self.entries.get(canonical, [canonical])
+    
+    def canonical(self, name):
+        """
+        Canonical name for an alias, or None if the gazetteer doesn't know it
+        A trailing generic word is ignored ("Eastway Drive Corridor")
+        """
+        words = normalize_words(name)
+        while words:
+            found = self._canonical.get(' '.join(words))
+            if found is not None:
+                return found
+            if words[-1] not in GENERIC_SUFFIXES:
+                return None
+            words = words[:-1]
+        return None
+    
+    def find(self, text):
+        """
+        Longest gazetteer matches in one pass over the text's words
+        Returns list of (start, end, canonical) in text order, non-overlapping
+        """
+        tokens = [(m.start(), m.end(), m.group().lower().rstrip('.'))
+                  for m in WORD_PATTERN.finditer(text)]
+        matches = []
+        i = 0
+        while i < len(tokens):
+            node = self._trie
+            best = None
+            j = i
+            while j < len(tokens):
+                node = node.get(tokens[j][2])
+                if node is None:
+                    break
+                j += 1
+                if _END in node:
+                    best = (j, node[_END])
+            if best is None:
+                i += 1
+                continue
+            j, canonical = best
+            matches.append((tokens[i][0], tokens[j - 1][1], canonical))
+            i = j
+        return matches
@@ -0,0 +1,226 @@
+"""
+Corridor Index
+--------------
+Persistent inverted index over analyzed documents
+
+Every opportunity found by analyze_documents is recorded once, so questions
+like "which documents since 2024-06 mention Eastway Drive with
+infrastructure language?" are answered from indexed SQLite lookups instead
+of re-running the analysis over the whole corpus.
+
+    with CorridorIndex('corridor_index.sqlite') as index:
+        tracker.analyze_documents(documents, index=index)
+        rows = index.query(corridor_prefix='Eastway', since='2024-06',
+                           keyword_category='infrastructure')
+
+The index stores, per corridor and document: the date, signal strength,
+timeline category and the offsets of each evidence quote's mention; and
+per keyword, which corridors' context windows it appeared in.
+"""
+
+import json
+import sqlite3
+
+from municipal_rezoning_tracker import MunicipalRezoningTracker
+
+
+class CorridorIndex:
+    """
+    corridor -> documents/dates/scores/evidence offsets, keyword -> corridors
+    
+    Re-adding a document (same name) replaces its earlier entries. Pass the
+    tracker's intent_keywords if they were customized, so keyword hits are
+    filed under the right category.
+    """
+    
+    def __init__(self, path='corridor_index.sqlite', intent_keywords=None):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS documents (
+                doc_id INTEGER PRIMARY KEY,
+                name TEXT UNIQUE NOT NULL,
+                date TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS mentions (
+                corridor TEXT NOT NULL,
+                corridor_key TEXT NOT NULL,
+                doc_id INTEGER NOT NULL,
+                date TEXT NOT NULL,
+                score REAL NOT NULL,
+                timeline TEXT NOT NULL,
+                evidence_offsets TEXT NOT NULL,
+                PRIMARY KEY (corridor, doc_id)
+            );
+            CREATE INDEX IF NOT EXISTS mentions_corridor ON mentions (corridor_key, date);
+            CREATE INDEX IF NOT EXISTS mentions_date ON mentions (date);
+            CREATE INDEX IF NOT EXISTS mentions_doc ON mentions (doc_id);
+            CREATE TABLE IF NOT EXISTS keywords (
+                keyword TEXT NOT NULL,
+                category TEXT NOT NULL,
+                corridor TEXT NOT NULL,
+                doc_id INTEGER NOT NULL,
+                hits INTEGER NOT NULL,
+                PRIMARY KEY (corridor, doc_id, keyword)
+            );
+            CREATE INDEX IF NOT EXISTS keywords_keyword ON keywords (keyword);
+            CREATE INDEX IF NOT EXISTS keywords_category ON keywords (category, corridor, doc_id);
+            CREATE INDEX IF NOT EXISTS keywords_doc ON keywords (doc_id);
+        ''')
+        self._categories = {}
+        if intent_keywords is None:
+            intent_keywords = MunicipalRezoningTracker().intent_keywords
+        for category, keywords in intent_keywords.items():
+            for keyword in keywords:
+                self._categories.setdefault(keyword.lower(), category)
+    
+    def add_document(self, name, date, opportunities):
+        """
+        Record one document's opportunities
+        Opportunities need the 'keyword_counts' that analyze_document adds
+        with include_details=True
+        """
+        self.remove_document(name)
+        doc_id = self.conn.execute(
+            'INSERT INTO documents (name, date) VALUES (?, ?)', (name, date)
+        ).lastrowid
+        
+        mention_rows = []
+        keyword_rows = []
+        for opp in opportunities:
+            corridor = opp['corridor']
+            mention_rows.append((
+                corridor, corridor.lower(), doc_id, date, opp['signal_strength'],
+                opp['timeline'], json.dumps(opp.get('evidence_offsets', []))
+            ))
+            for keyword, hits in opp.get('keyword_counts', {}).items():
+                category = self._categories.get(keyword, '')
+                keyword_rows.append((keyword, category, corridor, doc_id, hits))
+        
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO mentions VALUES (?, ?, ?, ?, ?, ?, ?)', mention_rows
+        )
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO keywords VALUES (?, ?, ?, ?, ?)', keyword_rows
+        )
+    
+    def remove_document(self, name):
+        row = self.conn.execute('SELECT doc_id FROM documents WHERE name = ?', (name,)).fetchone()
+        if row is None:
+            return False
+        for table in ('mentions', 'keywords', 'documents'):
+            self.conn.execute(f'DELETE FROM {table} WHERE doc_id = ?', row)
+        return True
+    
+    def query(self, corridor=None, corridor_prefix=None, since=None, until=None,
+              min_score=None, timeline=None, keyword=None, keyword_category=None,
+              limit=None):
+        """
+        Corridor mentions matching every given filter, newest first
+        
+        Args:
+            corridor: Exact corridor name (case-insensitive)
+            corridor_prefix: Corridor name prefix (case-insensitive)
+            since, until: Inclusive date bounds; partial dates like '2024-06' work
+            min_score: Minimum per-document signal strength
+            timeline: Timeline category, or a list of them
+            keyword: Only mentions whose context contains this intent keyword
+            keyword_category: Only mentions with keywords of this category
+                (high_signal, medium_signal or infrastructure)
+            limit: Maximum number of rows
+        
+        Returns list of dicts with corridor, document, date, score, timeline
+        and evidence_offsets
+        """
+        clauses = []
+        params = []
+        if corridor is not None:
+            clauses.append('m.corridor_key = ?')
+            params.append(corridor.lower())
+        if corridor_prefix:
+            # A range on the index instead of LIKE, which can't use it
+            prefix = corridor_prefix.lower()
+            clauses.append('m.corridor_key >= ? AND m.corridor_key < ?')
+            params.extend([prefix, prefix + '\uffff'])
+        if since is not None:
+            clauses.append('m.date >= ?')
+            params.append(since)
+        if until is not None:
+            # '2024-06' should include every day of June
+            clauses.append('m.date <= ?')
+            params.append(until + '\uffff')
+        if min_score is not None:
+            clauses.append('m.score >= ?')
+            params.append(min_score)
+        if timeline is not None:
+            timelines = [timeline] if isinstance(timeline, str) else list(timeline)
+            clauses.append(f"m.timeline IN ({', '.join('?' * len(timelines))})")
+            params.extend(timelines)
+        if keyword is not None:
+            clauses.append('EXISTS (SELECT 1 FROM keywords k WHERE k.corridor = m.corridor '
+                           'AND k.doc_id = m.doc_id AND k.keyword = ?)')
+            params.append(keyword.lower())
+        if keyword_category is not None:
+            clauses.append('EXISTS (SELECT 1 FROM keywords k WHERE k.category = ? '
+                           'AND k.corridor = m.corridor AND k.doc_id = m.doc_id)')
+            params.append(keyword_category)
+        
+        sql = ('SELECT m.corridor, d.name, m.date, m.score, m.timeline, m.evidence_offsets '
+               'FROM mentions m JOIN documents d ON d.doc_id = m.doc_id')
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY m.date DESC, m.score DESC, m.corridor, d.name'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        
+        return [
+            {
+                'corridor': corridor_name,
+                'document': document,
+                'date': date,
+                'score': score,
+                'timeline': timeline_category,
+                'evidence_offsets': json.loads(offsets)
+            }
+            for corridor_name, document, date, score, timeline_category, offsets
+            in self.conn.execute(sql, params)
+        ]
+    
+    def corridors_for_keyword(self, keyword):
+        """Corridors whose context windows contain a keyword, by total hits"""
+        rows = self.conn.execute(
+            'SELECT corridor, SUM(hits), COUNT(*) FROM keywords WHERE keyword = ? '
+            'GROUP BY corridor ORDER BY SUM(hits) DESC, corridor',
+            (keyword.lower(),)
+        )
+        return [{'corridor': corridor, 'hits': hits, 'documents': documents}
+                for corridor, hits, documents in rows]
+    
+    def corridors(self, prefix=''):
+        """Indexed corridor names starting with prefix (case-insensitive)"""
+        prefix = prefix.lower()
+        rows = self.conn.execute(
+            'SELECT DISTINCT corridor FROM mentions WHERE corridor_key >= ? AND corridor_key < ? '
+            'ORDER BY corridor',
+            (prefix, prefix + '\uffff')
+        )
+        return [row[0] for row in rows]
+    
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM documents').fetchone()[0]
+    
+    def commit(self):
+        self.conn.commit()
+    
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
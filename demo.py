@@ -6,7 +6,6 @@ Demonstrates the complete analysis pipeline
 
 from municipal_rezoning_tracker import MunicipalRezoningTracker
 from sample_planning_documents import get_sample_documents
-import json
 
 def main():
     print("\n" + "=" * 80)
@@ -68,11 +67,10 @@ def main():
         print(f"   Score: {row['Total Score']:.0f} | Timeline: {row['Timeline']}")
         print(f"   Mentioned in: {row['Documents']}")
     
-    # Export detailed JSON for further analysis
-    json_filename = 'rezoning_opportunities_detailed.json'
-    with open(json_filename, 'w') as f:
-        json.dump(opportunities, f, indent=2)
-    print(f"\n✓ Detailed analysis exported to: {json_filename}")
+    # Export detailed JSON Lines (one opportunity per line) for further analysis
+    jsonl_filename = 'rezoning_opportunities_detailed.jsonl'
+    tracker.export_to_jsonl(opportunities, jsonl_filename)
+    print(f"\n✓ Detailed analysis exported to: {jsonl_filename}")
     
     print("\n" + "=" * 80)
     print("KEY INSIGHTS")
@@ -108,12 +106,13 @@ def main():
     print("\n" + "=" * 80)
     print("PROOF OF CONCEPT COMPLETE")
     print("=" * 80)
+    print("\nProduction Building Blocks:")
+    print("  - Document collection from the planning portal: portal_fetcher.py")
+    print("  - Parcel-level data for specific investment opportunities: parcel_join.py")
+    print("  - Alerts for new document releases: document_watcher.py")
     print("\nNext Steps for Production System:")
-    print("  1. Automate document collection from Charlotte's planning portal")
-    print("  2. Add historical pattern matching (compare to past successful rezonings)")
-    print("  3. Integrate parcel-level data to identify specific investment opportunities")
-    print("  4. Build alert system for new document releases")
-    print("  5. Add competitive intelligence (track which developers are active in each corridor)")
+    print("  1. Add historical pattern matching (compare to past successful rezonings)")
+    print("  2. Add competitive intelligence (track which developers are active in each corridor)")
     print("\n")
 
 
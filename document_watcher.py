@@ -0,0 +1,279 @@
+"""
+Document Watcher
+----------------
+Watches a drop folder of planning documents and raises alerts
+
+New or modified files are analyzed on their own and merged into the
+running aggregate, so the rest of the corpus is never recomputed. A
+modified or deleted file has its old contribution retracted first. Only
+the corridors it touched are rebuilt, from the stored per-file results.
+
+The folder is polled with os.scandir, comparing each file's size and
+mtime, so no platform-specific notification API is needed. A file is
+analyzed once it has looked the same on two polls in a row, so half-copied
+files are skipped. With the default 0.25s interval a dropped file is
+picked up in well under a second.
+
+Alerts are raised when a corridor's total score crosses score_threshold,
+or its timeline becomes at least as urgent as timeline_threshold. They go
+to a JSONL file and/or a callback:
+
+    python document_watcher.py planning_drop/ --alerts alerts.jsonl --score 50
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from municipal_rezoning_tracker import CorridorAggregator, MunicipalRezoningTracker
+
+TEXT_EXTENSIONS = ('.txt', '.md')
+
+
+def read_document(path):
+    """A dropped file as a tracker document (text files, or PDFs via pdf_ingestion)"""
+    if path.lower().endswith('.pdf'):
+        from pdf_ingestion import read_pdf_document
+        return read_pdf_document(path)
+    with open(path, encoding='utf-8', errors='replace') as f:
+        text = f.read()
+    return {
+        'text': text,
+        'name': os.path.splitext(os.path.basename(path))[0],
+        'date': datetime.fromtimestamp(os.path.getmtime(path)).strftime('%Y-%m-%d')
+    }
+
+
+class DocumentWatcher:
+    """
+    Incremental analysis of a drop folder, with threshold alerts
+    
+    Args:
+        directory: Folder to watch (not recursive)
+        tracker: Configured MunicipalRezoningTracker
+        alert_path: Optional JSONL file every alert is appended to
+        on_alert: Optional callback(alert) for every alert
+        score_threshold: Alert when a corridor's total score reaches this
+        timeline_threshold: Alert when a corridor's timeline becomes this
+            urgent or more (None to disable)
+        interval: Seconds between polls in run()
+        extensions: File types picked up
+        alert_existing: Also alert for files already there at the first poll
+        cache: Optional ResultCache for per-document results
+    """
+    
+    def __init__(self, directory, tracker=None, alert_path=None, on_alert=None,
+                 score_threshold=50, timeline_threshold='immediate', interval=0.25,
+                 extensions=TEXT_EXTENSIONS + ('.pdf',), alert_existing=False, cache=None):
+        self.directory = directory
+        self.tracker = tracker or MunicipalRezoningTracker()
+        self.alert_path = alert_path
+        self.on_alert = on_alert
+        self.score_threshold = score_threshold
+        self.timeline_threshold = timeline_threshold
+        self.interval = interval
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.alert_existing = alert_existing
+        self.cache = cache
+        
+        self.aggregator = CorridorAggregator()
+        # path -> (size, mtime_ns) of the analyzed version
+        self.known = {}
+        # path -> opportunities of the analyzed version
+        self.file_opportunities = {}
+        self.corridor_files = defaultdict(set)
+        self._pending = {}
+        # path -> ((size, mtime_ns), error) of files that failed to read;
+        # skipped until they change
+        self.unreadable = {}
+        self._polls = 0
+    
+    def _scan(self):
+        found = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.lower().endswith(self.extensions):
+                    stat = entry.stat()
+                    found[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return found
+    
+    def poll(self):
+        """One pass over the folder; returns the alerts it raised"""
+        first = self._polls == 0
+        self._polls += 1
+        found = self._scan()
+        
+        ready = []
+        for path, signature in sorted(found.items()):
+            if self.known.get(path) == signature or self.unreadable.get(path, (None,))[0] == signature:
+                self._pending.pop(path, None)
+            elif first or self._pending.get(path) == signature:
+                # Unchanged since the last poll, so it is fully written
+                ready.append(path)
+                self._pending.pop(path, None)
+            else:
+                self._pending[path] = signature
+        removed = [path for path in self.known if path not in found]
+        for waiting in (self._pending, self.unreadable):
+            for path in list(waiting):
+                if path not in found:
+                    del waiting[path]
+        
+        alerts = []
+        for path in removed:
+            alerts.extend(self._merge(path, None))
+            del self.known[path]
+        
+        documents = []
+        paths = []
+        for path in ready:
+            try:
+                documents.append(read_document(path))
+            except Exception as e:
+                # Corrupt or unreadable (e.g. PyPDF2's PdfReadError); retried
+                # only when it changes again, so one bad file can't stop run()
+                self.unreadable[path] = (found[path], f'{type(e).__name__}: {e}')
+                continue
+            self.unreadable.pop(path, None)
+            paths.append(path)
+            self.known[path] = found[path]
+        
+        results = self.tracker.iter_document_opportunities(documents, cache=self.cache)
+        for path, opportunities in zip(paths, results):
+            alerts.extend(self._merge(path, opportunities))
+        
+        if first and not self.alert_existing:
+            return []
+        for alert in alerts:
+            self._emit(alert)
+        return alerts
+    
+    def _merge(self, path, opportunities):
+        """
+        Replace a file's contribution (None removes it); returns alerts for
+        the corridors whose totals changed
+        """
+        old = self.file_opportunities.pop(path, None)
+        if opportunities is not None:
+            self.file_opportunities[path] = opportunities
+        
+        touched = {opp['corridor'] for opp in opportunities or []}
+        before = {}
+        if old is None:
+            for corridor in touched:
+                before[corridor] = self._state(corridor)
+            if opportunities is not None:
+                self.aggregator.add(opportunities)
+        else:
+            touched |= {opp['corridor'] for opp in old}
+            for corridor in touched:
+                before[corridor] = self._state(corridor)
+                self.aggregator.corridors.pop(corridor, None)
+            if opportunities is None:
+                self.aggregator.documents_seen -= 1
+            
+            # Rebuild only the touched corridors, from every file that has them
+            for opp in old:
+                self.corridor_files[opp['corridor']].discard(path)
+            rebuild = set()
+            for corridor in touched:
+                rebuild |= self.corridor_files[corridor]
+            if opportunities is not None:
+                rebuild.add(path)
+            for other in self.file_opportunities:
+                if other in rebuild:
+                    self.aggregator.fold(opp for opp in self.file_opportunities[other]
+                                         if opp['corridor'] in touched)
+        
+        for opp in opportunities or []:
+            self.corridor_files[opp['corridor']].add(path)
+        return self._alerts(path, before)
+    
+    def _state(self, corridor):
+        record = self.aggregator.corridors.get(corridor)
+        if record is None:
+            return 0, None
+        return record.total_score, record.timeline
+    
+    def _alerts(self, path, before):
+        priority = CorridorAggregator.TIMELINE_PRIORITY.get
+        alerts = []
+        for corridor in sorted(before):
+            old_score, old_timeline = before[corridor]
+            new_score, new_timeline = self._state(corridor)
+            reasons = []
+            if old_score < self.score_threshold <= new_score:
+                reasons.append('score')
+            if (self.timeline_threshold is not None and new_timeline is not None
+                    and priority(new_timeline, 4) <= priority(self.timeline_threshold, 4)
+                    and (old_timeline is None
+                         or priority(old_timeline, 4) > priority(self.timeline_threshold, 4))):
+                reasons.append('timeline')
+            if reasons:
+                alerts.append({
+                    'time': datetime.now().isoformat(timespec='seconds'),
+                    'corridor': corridor,
+                    'reasons': reasons,
+                    'total_score': new_score,
+                    'previous_score': old_score,
+                    'timeline': new_timeline,
+                    'previous_timeline': old_timeline,
+                    'file': path
+                })
+        return alerts
+    
+    def _emit(self, alert):
+        if self.alert_path is not None:
+            with open(self.alert_path, 'a') as f:
+                f.write(json.dumps(alert) + '\n')
+        if self.on_alert is not None:
+            self.on_alert(alert)
+    
+    def ranked(self):
+        return self.aggregator.ranked()
+    
+    def run(self, stop=None):
+        """Poll until stop (a threading.Event) is set, or forever"""
+        while stop is None or not stop.is_set():
+            started = time.monotonic()
+            self.poll()
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Watch a folder of planning documents')
+    parser.add_argument('directory')
+    parser.add_argument('--alerts', default='rezoning_alerts.jsonl',
+                        help='JSONL file alerts are appended to')
+    parser.add_argument('--score', type=float, default=50,
+                        help='alert when a corridor total score reaches this')
+    parser.add_argument('--timeline', default='immediate',
+                        help="alert when a corridor's timeline becomes this urgent")
+    parser.add_argument('--interval', type=float, default=0.25)
+    parser.add_argument('--gazetteer', help='gazetteer JSON/CSV of known corridor names')
+    args = parser.parse_args()
+    
+    gazetteer = None
+    if args.gazetteer:
+        from corridor_gazetteer import CorridorGazetteer
+        gazetteer = CorridorGazetteer.load(args.gazetteer)
+    
+    def show(alert):
+        print(f"ALERT {alert['corridor']}: {', '.join(alert['reasons'])} "
+              f"(score {alert['total_score']}, timeline {alert['timeline']}) <- {alert['file']}")
+    
+    watcher = DocumentWatcher(args.directory, MunicipalRezoningTracker(gazetteer=gazetteer),
+                              alert_path=args.alerts, on_alert=show, score_threshold=args.score,
+                              timeline_threshold=args.timeline, interval=args.interval)
+    print(f"Watching {args.directory} (alerts -> {args.alerts})")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
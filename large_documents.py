@@ -0,0 +1,160 @@
+"""
+Large Documents
+---------------
+Analyzes multi-hundred-MB text files (e.g. concatenated minute archives)
+without loading them into one Python string
+
+The file is memory-mapped and decoded in overlapping chunks. Each chunk
+"owns" the matches that start inside its own byte range. The overlap on
+both sides is wider than the 300-character scoring window, so every
+window around an owned mention is complete within the chunk. That covers
+keyword counts, the 200-character timeline window and the 150-character
+evidence quotes. Matches across chunk boundaries are therefore neither
+lost nor counted twice.
+
+Two passes are made: one to collect corridor names, one to score them.
+Peak memory depends on the chunk size, not the file size.
+
+    opportunities = analyze_large_file(tracker, 'minutes_archive_2019_2024.txt',
+                                       document_date='2024-12-31')
+"""
+
+import mmap
+import os
+from collections import Counter
+
+from municipal_rezoning_tracker import MIN_SIGNAL_STRENGTH, CorridorAggregator, KeywordIndex
+
+# Widest context any stage reads around a mention (signal strength window)
+CONTEXT_WINDOW = 300
+# Most bytes one character can take in UTF-8
+UTF8_MAX_BYTES = 4
+
+
+def _char_start(data, position):
+    """First UTF-8 character boundary at or after a byte position"""
+    size = len(data)
+    while position < size and (data[position] & 0xC0) == 0x80:
+        position += 1
+    return position
+
+
+def iter_mmap_chunks(path, chunk_bytes=8 << 20, overlap_bytes=4096):
+    """
+    Yield (text, start, stop, offset) for overlapping chunks of a UTF-8 file
+    
+    text[start:stop] is the chunk's own part of the file; the rest is
+    overlap shared with its neighbours. offset is the character offset of
+    text[0] within the whole file, so chunk positions map to file positions.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            size = len(data)
+            owned_chars = 0
+            a = 0
+            while a < size:
+                b = _char_start(data, min(a + chunk_bytes, size))
+                head_start = _char_start(data, max(0, a - overlap_bytes))
+                tail_stop = _char_start(data, min(size, b + overlap_bytes))
+                
+                head = data[head_start:a].decode('utf-8', errors='replace')
+                body = data[a:b].decode('utf-8', errors='replace')
+                tail = data[b:tail_stop].decode('utf-8', errors='replace')
+                
+                yield head + body + tail, len(head), len(head) + len(body), owned_chars - len(head)
+                owned_chars += len(body)
+                a = b
+
+
+def analyze_large_file(tracker, path, document_name=None, document_date=None,
+                       chunk_bytes=8 << 20, overlap_bytes=4096, max_quotes=2):
+    """
+    analyze_document for a file too large to hold as one string
+    
+    Returns the same opportunity dicts as analyze_document; evidence quotes
+    are the first ones in file order. Corridors are listed alphabetically.
+    
+    Args:
+        tracker: MunicipalRezoningTracker
+        path: UTF-8 text file
+        document_name: Defaults to the file name
+        document_date: Date reported for the document
+        chunk_bytes: Bytes owned by each chunk (sets peak memory)
+        overlap_bytes: Bytes shared with each neighbouring chunk; widened to
+            cover the scoring window plus the longest corridor name
+        max_quotes: Evidence quotes per corridor
+    """
+    if document_name is None:
+        document_name = os.path.splitext(os.path.basename(path))[0]
+    
+    # Pass 1: corridor names (a name belongs to the chunk its match starts in)
+    corridors = set()
+    for text, start, stop, _ in iter_mmap_chunks(path, chunk_bytes, overlap_bytes):
+        corridors.update(corridor for position, corridor in tracker.corridor_matches(text)
+                         if start <= position < stop)
+    corridors = sorted(corridors)
+    if not corridors:
+        return []
+    
+    # A UTF-8 character takes up to 4 bytes, so this many bytes always holds
+    # the full window in characters
+    overlap_bytes = max(overlap_bytes,
+                        UTF8_MAX_BYTES * (CONTEXT_WINDOW + max(len(c) for c in corridors) + 1))
+    
+    # Pass 2: per-corridor sums of everything the score and report need
+    priority = CorridorAggregator.TIMELINE_PRIORITY
+    class_counts = {c: Counter() for c in corridors}
+    mention_counts = dict.fromkeys(corridors, 0)
+    timelines = dict.fromkeys(corridors, 'unspecified')
+    evidence = {c: [] for c in corridors}
+    evidence_offsets = {c: [] for c in corridors}
+    evidence_hits = {c: [] for c in corridors}
+    
+    for text, start, stop, offset in iter_mmap_chunks(path, chunk_bytes, overlap_bytes):
+        mention_index = tracker.build_mention_index(text, corridors)
+        keyword_index = KeywordIndex(text, tracker.intent_keywords, tracker.patterns.keyword_scanner)
+        for corridor in corridors:
+            mentions = [span for span in mention_index[corridor] if start <= span[0] < stop]
+            if not mentions:
+                continue
+            class_counts[corridor].update(tracker.keyword_class_counts(text, mentions, keyword_index))
+            mention_counts[corridor] += len(mentions)
+            
+            # Most urgent timeline over all chunks
+            if timelines[corridor] != 'immediate':
+                timeline = tracker.extract_timeline_signals(text, corridor, mentions)
+                if priority.get(timeline, 4) < priority.get(timelines[corridor], 4):
+                    timelines[corridor] = timeline
+            
+            quotes = evidence[corridor]
+            if len(quotes) < max_quotes:
+                spans = tracker.evidence_spans(text, mentions, max_quotes - len(quotes))
+                quotes.extend(quote for _, _, quote in spans)
+                evidence_offsets[corridor].extend(
+                    [offset + mention_start, offset + mention_end] for mention_start, mention_end, _ in spans
+                )
+                evidence_hits[corridor].extend(
+                    tracker.evidence_keyword_hits(text, spans, keyword_index)
+                )
+    
+    opportunities = []
+    for corridor in corridors:
+        if not mention_counts[corridor]:
+            continue
+        signal_strength = tracker.signal_score(class_counts[corridor], mention_counts[corridor])
+        
+        # Only include corridors with meaningful signal
+        if signal_strength >= MIN_SIGNAL_STRENGTH:
+            opportunities.append({
+                'corridor': corridor,
+                'signal_strength': signal_strength,
+                'timeline': timelines[corridor],
+                'source_document': document_name,
+                'document_date': document_date,
+                'evidence': evidence[corridor],
+                'evidence_offsets': evidence_offsets[corridor],
+                'evidence_keyword_hits': evidence_hits[corridor]
+            })
+    return opportunities
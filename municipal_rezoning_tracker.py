@@ -12,10 +12,661 @@ Technical Approach:
 """
 
 import re
-import pandas as pd
-from collections import defaultdict, Counter
+import csv
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque, Counter
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+import hashlib
+import heapq
 import json
+import math
+import zlib
+
+# Opportunities below this signal strength are not reported
+MIN_SIGNAL_STRENGTH = 15
+
+# Yielded by iter_document_opportunities for documents a DuplicateDetector
+# skipped; empty, so callers can treat it as a document without opportunities
+SKIPPED_DOCUMENT = ()
+
+# Bump when a change alters analyze_document output, so cached results are
+# not reused across versions
+ANALYSIS_VERSION = 4
+
+
+# Timeline indicators by category, most urgent first
+TIMELINE_PATTERNS = {
+    'immediate': [r'within (\d+) months?', r'by (\d{4})', r'next year', r'immediate'],
+    'near_term': [r'within (\d+) years?', r'short[- ]term', r'upcoming'],
+    'long_term': [r'long[- ]term', r'future', r'eventual', r'phase [2-9]']
+}
+
+
+@lru_cache(maxsize=4096)
+def literal_pattern(literal):
+    """Compiled case-insensitive pattern for a literal (corridor names, keywords)"""
+    return re.compile(re.escape(literal), re.IGNORECASE)
+
+
+class LiteralScanner:
+    """
+    Finds all case-insensitive occurrences of several literal strings in one pass
+    Compiled once; scanning does not modify it, so it can be shared freely.
+    """
+    
+    def __init__(self, literals):
+        self.names = tuple(sorted(set(literals), key=len, reverse=True))
+        self.lowered = {name: name.lower() for name in self.names}
+        
+        # Longest literals first so the alternation reports the longest hit at
+        # each position; shorter literals starting there are its prefixes.
+        # The IGNORECASE form is only compiled (via re's own cache) when a
+        # non-ASCII text needs it.
+        self.alternation = '|'.join(re.escape(name) for name in self.names)
+        
+        # ASCII text can be lowercased once and matched case-sensitively,
+        # which is several times faster than an IGNORECASE alternation
+        self.ascii = all(name.isascii() for name in self.names)
+        self.lower_scanner = re.compile(
+            '|'.join(re.escape(self.lowered[name]) for name in self.names)
+        ) if self.names and self.ascii else None
+        
+        self.prefix_table = {
+            name.lower(): self._prefixes_of(name.lower()) for name in self.names
+        }
+    
+    def _prefixes_of(self, key):
+        """Literals whose lowercase form is a prefix of key (longest first)"""
+        return tuple(name for name in self.names if key.startswith(self.lowered[name]))
+    
+    def scan(self, text):
+        """
+        Returns dict mapping literal -> list of (start, end) spans. Spans for a
+        single literal never overlap, exactly as re.finditer on it would report.
+        """
+        spans = {name: [] for name in self.names}
+        if not self.names:
+            return spans
+        last_end = dict.fromkeys(self.names, 0)
+        
+        fast = self.lower_scanner is not None and text.isascii()
+        if fast:
+            haystack = text.lower()
+            search = self.lower_scanner.search
+        else:
+            haystack = text
+            search = re.compile(self.alternation, re.IGNORECASE).search
+        
+        match = search(haystack)
+        while match:
+            pos = match.start()
+            key = match.group().lower()
+            candidates = self.prefix_table.get(key)
+            if candidates is None:
+                candidates = self._prefixes_of(key)
+            for name in candidates:
+                if pos < last_end[name]:
+                    continue
+                if fast:
+                    if not haystack.startswith(self.lowered[name], pos):
+                        continue
+                    end = pos + len(name)
+                else:
+                    hit = literal_pattern(name).match(text, pos)
+                    if not hit:
+                        continue
+                    end = hit.end()
+                spans[name].append((pos, end))
+                last_end[name] = end
+            # Resume one character later (not at the match end) so hits of
+            # other literals inside this one are still found
+            match = search(haystack, pos + 1)
+        
+        return spans
+
+
+def scan_literals(text, literals):
+    """
+    One-off scan for several literals (use a LiteralScanner to reuse the compile)
+    
+    A document's corridor set is different every time, so compiling an
+    alternation for it costs far more than the scan itself. ASCII text is
+    instead lowercased once and searched with str.find per literal, which
+    reports the same non-overlapping spans. Other text uses the per-literal
+    patterns, which stay compiled in the literal_pattern cache.
+    """
+    literals = set(literals)
+    if not (text.isascii() and all(literal.isascii() for literal in literals)):
+        return {
+            literal: [match.span() for match in literal_pattern(literal).finditer(text)]
+            if literal else []
+            for literal in literals
+        }
+    
+    lowered = text.lower()
+    find = lowered.find
+    spans = {}
+    for literal in literals:
+        key = literal.lower()
+        if not key:
+            spans[literal] = []
+            continue
+        found = []
+        position = find(key)
+        while position >= 0:
+            found.append((position, position + len(key)))
+            position = find(key, position + len(key))
+        spans[literal] = found
+    return spans
+
+
+class PatternRegistry:
+    """
+    Every regular expression a tracker configuration needs, compiled once.
+    Immutable, so one registry can be shared across threads and shipped to
+    worker processes. Per-corridor patterns come from the LRU-bounded
+    literal_pattern cache.
+    """
+    
+    __slots__ = ('signature', 'corridor_patterns', 'timeline_patterns', 'keyword_scanner')
+    
+    literal_pattern = staticmethod(literal_pattern)
+    
+    def __init__(self, corridor_patterns, intent_keywords, timeline_patterns=TIMELINE_PATTERNS):
+        setattr_ = super().__setattr__
+        setattr_('signature', self.signature_of(corridor_patterns, intent_keywords))
+        setattr_('corridor_patterns', tuple(re.compile(p) for p in corridor_patterns))
+        setattr_('timeline_patterns', tuple(
+            (category, tuple(re.compile(p, re.IGNORECASE) for p in patterns))
+            for category, patterns in timeline_patterns.items()
+        ))
+        setattr_('keyword_scanner', LiteralScanner(
+            kw.lower() for kws in intent_keywords.values() for kw in kws if kw
+        ))
+    
+    @staticmethod
+    def signature_of(corridor_patterns, intent_keywords):
+        """Hashable snapshot of the configuration a registry was built from"""
+        return (tuple(corridor_patterns),
+                tuple((category, tuple(kws)) for category, kws in intent_keywords.items()))
+    
+    def __setattr__(self, name, value):
+        raise AttributeError('PatternRegistry is immutable')
+    
+    def __reduce__(self):
+        return (_rebuild_registry, (self.signature,))
+
+
+def _rebuild_registry(signature):
+    corridor_patterns, keywords = signature
+    return PatternRegistry(corridor_patterns, dict(keywords))
+
+
+# Tracker copy held by each process-pool worker (set once by _init_worker)
+_worker_tracker = None
+
+
+def _init_worker(tracker):
+    """Receive the tracker configuration once per worker process"""
+    global _worker_tracker
+    _worker_tracker = tracker
+
+
+def _analyze_with(tracker, doc, include_details=False):
+    return tracker.analyze_document(doc['text'], doc['name'], doc['date'],
+                                    doc.get('page_offsets'), include_details)
+
+
+def _analyze_in_worker(doc, include_details=False):
+    tracker = _worker_tracker
+    if tracker.stats is None:
+        return _analyze_with(tracker, doc, include_details), None
+    # Fresh stats per task, merged back into the parent's stats
+    tracker.stats = tracker.stats.fresh()
+    return _analyze_with(tracker, doc, include_details), tracker.stats
+
+
+def evidence_quote(text, mention_start, mention_end, width=150):
+    """Evidence quote around a mention, or None if too short to be useful"""
+    start = max(0, mention_start - width)
+    end = min(len(text), mention_end + width)
+    
+    # Clean up the quote
+    quote = ' '.join(text[start:end].split())
+    if len(quote) > 50:  # Only keep substantial quotes
+        return f"...{quote}..."
+    return None
+
+
+EVIDENCE_WORD = re.compile(r'[a-z0-9]+')
+
+
+def quote_shingles(quote, size=3):
+    """crc32 hashes of a quote's word shingles, for near-duplicate detection"""
+    words = EVIDENCE_WORD.findall(quote.lower())
+    if len(words) <= size:
+        return frozenset([zlib.crc32(' '.join(words).encode('utf-8'))])
+    return frozenset(zlib.crc32(' '.join(words[i:i + size]).encode('utf-8'))
+                     for i in range(len(words) - size + 1))
+
+
+def shingle_fingerprint(shingles):
+    """
+    Compact copy of quote_shingles for storing with kept evidence: 4 bytes
+    per shingle instead of a set of strings (several KB per quote)
+    """
+    return array('I', shingles)
+
+
+def near_duplicate(shingles, other, threshold=0.5):
+    """
+    Two quotes share at least threshold of the smaller one's shingles
+    (overlapping windows of one passage, or boilerplate repeated across documents)
+    shingles is a quote_shingles set; other may be a shingle_fingerprint
+    """
+    if not shingles or not other:
+        return not shingles and not other
+    return len(shingles.intersection(other)) >= threshold * min(len(shingles), len(other))
+
+
+class DocumentRef:
+    """A source document, shared by every corridor entry that cites it"""
+    
+    __slots__ = ('name', 'date')
+    
+    def __init__(self, name, date):
+        self.name = name
+        self.date = date
+
+
+class DocumentScore:
+    """One document's score for a corridor"""
+    
+    __slots__ = ('document', 'score')
+    
+    def __init__(self, document, score):
+        self.document = document
+        self.score = score
+
+
+class EvidenceSpan:
+    """
+    An evidence quote kept as the mention's position in its source document
+    (source = the document's position in the analyzed sequence)
+    """
+    
+    __slots__ = ('source', 'start', 'end')
+    
+    def __init__(self, source, start, end):
+        self.source = source
+        self.start = start
+        self.end = end
+
+
+class CorridorRecord:
+    """Running totals for one corridor"""
+    
+    __slots__ = ('total_score', 'num_mentions', 'timeline', 'documents', 'evidence')
+    
+    def __init__(self, timeline):
+        self.total_score = 0
+        self.num_mentions = 0
+        self.timeline = timeline
+        self.documents = []
+        # Min-heap of the best quotes: (rank, seq, EvidenceSpan or quote, shingles)
+        self.evidence = []
+
+
+class CorridorAggregator:
+    """
+    Running per-corridor totals across documents (a corridor might appear in
+    multiple documents). Each document's opportunities are folded in as soon
+    as they are available, so the corpus never has to be held in memory.
+    
+    Totals are kept in slotted records and every document is stored once as
+    a shared DocumentRef; dicts are only built when results are read. Given
+    the analyzed documents as a sequence (texts), evidence is kept as spans
+    into their text instead of copied quotes.
+    
+    Each corridor keeps only its max_evidence best quotes, in a bounded heap
+    ranked by keyword density, then document date (newest wins), then a
+    checksum of the quote. Near-duplicate quotes collapse into the better
+    one, so the kept evidence is the same on every run.
+    """
+    
+    TIMELINE_PRIORITY = {'immediate': 1, 'near_term': 2, 'long_term': 3, 'unspecified': 4}
+    
+    def __init__(self, keep_documents=True, texts=None, max_evidence=3):
+        self.keep_documents = keep_documents
+        self.texts = texts
+        self.max_evidence = max_evidence
+        self.corridors = {}
+        self.documents_seen = 0
+        self._refs = {}
+        self._seq = 0
+    
+    def add(self, opportunities):
+        """Fold one document's opportunities into the running totals"""
+        self.documents_seen += 1
+        self.fold(opportunities, source=self.documents_seen - 1)
+    
+    def _ref(self, name, date):
+        key = (name, date)
+        ref = self._refs.get(key)
+        if ref is None:
+            ref = self._refs[key] = DocumentRef(name, date)
+        return ref
+    
+    def fold(self, opportunities, source=None):
+        """
+        Fold opportunities in without counting a new document
+        source is the position of their document in self.texts, if known
+        """
+        priority = self.TIMELINE_PRIORITY.get
+        for opp in opportunities:
+            record = self.corridors.get(opp['corridor'])
+            if record is None:
+                record = self.corridors[opp['corridor']] = CorridorRecord(opp['timeline'])
+            record.total_score += opp['signal_strength']
+            record.num_mentions += 1
+            if self.keep_documents:
+                record.documents.append(DocumentScore(
+                    self._ref(opp['source_document'], opp['document_date']),
+                    opp['signal_strength']
+                ))
+            
+            # Keep the most urgent timeline seen so far
+            if priority(opp['timeline'], 4) < priority(record.timeline, 4):
+                record.timeline = opp['timeline']
+            
+            # Best unique evidence only
+            offsets = opp.get('evidence_offsets')
+            hits = opp.get('evidence_keyword_hits')
+            spans = self.texts is not None and source is not None and offsets is not None
+            for i, quote in enumerate(opp['evidence']):
+                rank = (
+                    (hits[i] if hits else 0) / max(1, len(quote.split())),
+                    opp['document_date'] or '',
+                    zlib.crc32(quote.encode('utf-8'))
+                )
+                self._offer(record, rank, quote,
+                            EvidenceSpan(source, *offsets[i]) if spans else quote)
+    
+    def _offer(self, record, rank, quote, evidence):
+        """Keep a quote if it ranks among the corridor's best; O(max_evidence)"""
+        heap = record.evidence
+        if len(heap) >= self.max_evidence and rank <= heap[0][0]:
+            # Worse than everything kept (and than any near-duplicate of it)
+            return
+        
+        shingles = quote_shingles(quote)
+        self._seq += 1
+        entry = (rank, self._seq, evidence, shingle_fingerprint(shingles))
+        for i, kept in enumerate(heap):
+            if near_duplicate(shingles, kept[3]):
+                if rank > kept[0]:
+                    heap[i] = entry
+                    heapq.heapify(heap)
+                return
+        
+        if len(heap) < self.max_evidence:
+            heapq.heappush(heap, entry)
+        else:
+            heapq.heapreplace(heap, entry)
+    
+    def quote(self, evidence):
+        """The quote text of a stored evidence entry"""
+        if isinstance(evidence, EvidenceSpan):
+            return evidence_quote(self.texts[evidence.source]['text'], evidence.start, evidence.end)
+        return evidence
+    
+    def opportunity(self, corridor):
+        """Ranked-opportunity dict for one corridor (None if never seen)"""
+        record = self.corridors.get(corridor)
+        if record is None:
+            return None
+        return {
+            'corridor': corridor,
+            'total_score': record.total_score,
+            'avg_score': record.total_score / record.num_mentions,
+            'num_mentions': record.num_mentions,
+            'timeline': record.timeline,
+            'documents': [
+                {'name': entry.document.name, 'date': entry.document.date, 'score': entry.score}
+                for entry in record.documents
+            ],
+            # Best unique pieces of evidence, best first
+            'evidence': [self.quote(entry[2]) for entry in sorted(record.evidence, reverse=True)]
+        }
+    
+    @staticmethod
+    def _rank_key(item):
+        # Sort by total score (ties by name, so the order never depends on
+        # which worker finished first)
+        corridor, record = item
+        return (-record.total_score, corridor)
+    
+    def ranked(self):
+        """Current ranking, in the format returned by analyze_documents"""
+        order = sorted(self.corridors.items(), key=self._rank_key)
+        return [self.opportunity(corridor) for corridor, _ in order]
+    
+    def top(self, n):
+        """
+        The n highest-scoring corridors, in ranking order
+        Uses a bounded heap, and only the returned corridors are built as dicts
+        """
+        best = heapq.nsmallest(n, self.corridors.items(), key=self._rank_key)
+        return [self.opportunity(corridor) for corridor, _ in best]
+    
+    def page(self, limit, cursor=None):
+        """
+        One page of the ranking for dashboards
+        Returns (opportunities, next_cursor); pass next_cursor back to get the
+        following page. next_cursor is None on the last page.
+        """
+        if limit < 1:
+            raise ValueError('limit must be at least 1')
+        items = self.corridors.items()
+        if cursor is not None:
+            after = tuple(json.loads(cursor))
+            items = (item for item in items if self._rank_key(item) > after)
+        
+        # One extra entry tells whether another page follows
+        best = heapq.nsmallest(limit + 1, items, key=self._rank_key)
+        next_cursor = None
+        if len(best) > limit:
+            best = best[:limit]
+            next_cursor = json.dumps(list(self._rank_key(best[-1])))
+        return [self.opportunity(corridor) for corridor, _ in best], next_cursor
+
+
+class CorridorMomentum:
+    """
+    Time-aware corridor rankings, updated incrementally by document date
+    
+    Every corridor keeps a few exponentially decayed sums, all measured from
+    one shared anchor day. Adding an opportunity is O(1) per corridor and
+    documents may arrive in any date order; values are decayed to the
+    requested date only when a ranking is read. That date can't be earlier
+    than the newest document, and documents whose date isn't YYYY-MM-DD are
+    left out and listed in `skipped`.
+    
+    Per corridor:
+        momentum_score: signal strength decayed with half_life_days
+        velocity: recent mentions per 30 days (short_half_life_days window)
+        trend: recent score per 30 days minus the long-run rate
+            (long_half_life_days window); positive means picking up
+    
+    Args:
+        half_life_days: Age at which a document's score counts half
+        short_half_life_days: Horizon of velocity and the recent side of trend
+        long_half_life_days: Horizon of the baseline side of trend
+    """
+    
+    # Rebase the anchor before exp() could overflow a float
+    MAX_EXPONENT = 500.0
+    
+    def __init__(self, half_life_days=90, short_half_life_days=30, long_half_life_days=180):
+        # Decay rates per day: momentum score, short window, long window
+        self.rates = tuple(math.log(2) / days for days in
+                           (half_life_days, short_half_life_days, long_half_life_days))
+        self.anchor = None
+        self.latest = None
+        self.corridors = {}
+        self.documents_seen = 0
+        self.skipped = []
+        self._days = {}
+    
+    def _day(self, date):
+        day = self._days.get(date)
+        if day is None:
+            day = self._days[date] = datetime.strptime(str(date)[:10], '%Y-%m-%d').toordinal()
+        return day
+    
+    def _rebase(self, anchor):
+        """Move the anchor day, rescaling every stored sum"""
+        shift = [math.exp(-rate * (anchor - self.anchor)) for rate in self.rates]
+        score_rate, short_rate, long_rate = shift
+        for data in self.corridors.values():
+            data['score'] *= score_rate
+            data['short_count'] *= short_rate
+            data['short_score'] *= short_rate
+            data['long_score'] *= long_rate
+        self.anchor = anchor
+    
+    def add(self, opportunities):
+        """Fold one document's opportunities in (each carries its document_date)"""
+        self.documents_seen += 1
+        try:
+            days = [self._day(opp['document_date']) for opp in opportunities]
+        except ValueError:
+            first = opportunities[0]
+            self.skipped.append({'document': first.get('source_document'),
+                                 'date': first['document_date']})
+            return
+        
+        for opp, day in zip(opportunities, days):
+            if self.anchor is None:
+                self.anchor = day
+            elif max(self.rates) * (day - self.anchor) > self.MAX_EXPONENT:
+                self._rebase(day)
+            if self.latest is None or day > self.latest:
+                self.latest = day
+            
+            score_w, short_w, long_w = [math.exp(rate * (day - self.anchor)) for rate in self.rates]
+            strength = opp['signal_strength']
+            data = self.corridors.get(opp['corridor'])
+            if data is None:
+                data = self.corridors[opp['corridor']] = {
+                    'score': 0.0,
+                    'short_count': 0.0,
+                    'short_score': 0.0,
+                    'long_score': 0.0,
+                    'num_mentions': 0,
+                    'last_day': day,
+                    'timeline': opp['timeline']
+                }
+            data['score'] += strength * score_w
+            data['short_count'] += short_w
+            data['short_score'] += strength * short_w
+            data['long_score'] += strength * long_w
+            data['num_mentions'] += 1
+            data['last_day'] = max(data['last_day'], day)
+            
+            priority = CorridorAggregator.TIMELINE_PRIORITY.get
+            if priority(opp['timeline'], 4) < priority(data['timeline'], 4):
+                data['timeline'] = opp['timeline']
+    
+    def _as_of_day(self, as_of):
+        if as_of is None:
+            return self.latest
+        day = self._day(as_of)
+        # Later documents would be "decayed" backwards and grow without bound
+        if self.latest is not None and day < self.latest:
+            raise ValueError(f"as_of {as_of} is before the newest document "
+                             f"({datetime.fromordinal(self.latest).strftime('%Y-%m-%d')})")
+        return day
+    
+    def opportunity(self, corridor, as_of=None):
+        """Momentum figures for one corridor as of a date (default: latest document)"""
+        data = self.corridors.get(corridor)
+        if data is None:
+            return None
+        age = self._as_of_day(as_of) - self.anchor
+        score_rate, short_rate, long_rate = self.rates
+        score_decay, short_decay, long_decay = [math.exp(-rate * age) for rate in self.rates]
+        
+        # A decayed sum times the decay rate estimates a per-day rate
+        recent = data['short_score'] * short_decay * short_rate * 30
+        baseline = data['long_score'] * long_decay * long_rate * 30
+        return {
+            'corridor': corridor,
+            'momentum_score': round(data['score'] * score_decay, 4),
+            'velocity': round(data['short_count'] * short_decay * short_rate * 30, 4),
+            'trend': round(recent - baseline, 4),
+            'num_mentions': data['num_mentions'],
+            'last_mentioned': datetime.fromordinal(data['last_day']).strftime('%Y-%m-%d'),
+            'timeline': data['timeline']
+        }
+    
+    def ranked(self, as_of=None, top_n=None, by='momentum_score'):
+        """Corridors by a momentum figure (ties by name), as of a date"""
+        rows = [self.opportunity(corridor, as_of) for corridor in self.corridors]
+        key = lambda row: (-row[by], row['corridor'])
+        if top_n is not None:
+            return heapq.nsmallest(top_n, rows, key=key)
+        return sorted(rows, key=key)
+
+
+class KeywordIndex:
+    """
+    Positions of every intent keyword in a document, built with one scan.
+    Counts inside any window come from bisecting the sorted offsets, so scoring
+    a corridor no longer rescans the text once per keyword.
+    """
+    
+    def __init__(self, text, intent_keywords, scanner=None):
+        if scanner is None:
+            scanner = LiteralScanner(kw.lower() for kws in intent_keywords.values() for kw in kws if kw)
+        self.positions = {
+            keyword: [start for start, _ in spans]
+            for keyword, spans in scanner.scan(text).items()
+        }
+        
+        # Per category: hit starts and ends sorted by start. A keyword listed
+        # twice in a category counts twice, like the old per-keyword loop.
+        self.categories = {}
+        for category, kws in intent_keywords.items():
+            hits = sorted(
+                (start, start + len(kw))
+                for kw in kws if kw
+                for start in self.positions[kw.lower()]
+            )
+            max_len = max((len(kw) for kw in kws), default=0)
+            self.categories[category] = ([h[0] for h in hits], [h[1] for h in hits], max_len)
+    
+    def count_keyword(self, keyword, start, end):
+        """Hits of one keyword lying entirely inside text[start:end]"""
+        keyword = keyword.lower()
+        starts = self.positions.get(keyword, [])
+        return bisect_right(starts, end - len(keyword)) - bisect_left(starts, start)
+    
+    def count(self, category, start, end):
+        """Number of category keyword hits lying entirely inside text[start:end]"""
+        if category not in self.categories:
+            return 0
+        starts, ends, max_len = self.categories[category]
+        lo = bisect_left(starts, start)
+        # Hits starting this early always end inside the window
+        safe = bisect_right(starts, end - max_len, lo)
+        hi = bisect_left(starts, end, safe)
+        return (safe - lo) + sum(1 for i in range(safe, hi) if ends[i] <= end)
 
 class MunicipalRezoningTracker:
     """
@@ -23,7 +674,7 @@ class MunicipalRezoningTracker:
     comprehensive plan updates, UDO amendments, and policy documents.
     """
     
-    def __init__(self):
+    def __init__(self, gazetteer=None, stats=None):
         # Keywords that signal rezoning intent
         self.intent_keywords = {
             'high_signal': [
@@ -41,6 +692,13 @@ class MunicipalRezoningTracker:
             ]
         }
         
+        # Points per keyword hit in each category
+        self.keyword_weights = {
+            'high_signal': 10,
+            'medium_signal': 5,
+            'infrastructure': 8
+        }
+        
         # Geographic patterns (can be expanded with actual Charlotte data)
         self.corridor_patterns = [
             r'(?:along|near|adjacent to|corridor)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*(?:\s+(?:Street|Road|Boulevard|Avenue|Drive|Parkway|Highway|Corridor)))',
@@ -48,18 +706,56 @@ class MunicipalRezoningTracker:
             r'(?:between|from)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:and|to)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)'
         ]
         
-        self.results = []
+        # Optional CorridorGazetteer of known street/area names for the city;
+        # the regex patterns above then only catch names it doesn't contain
+        self.gazetteer = gazetteer
+        self._last_gazetteer_scan = (None, [])
+        
+        # Optional TrackerStats for per-stage timings (None = no instrumentation)
+        self.stats = stats
+        
+        # Drop corridors that provably cannot reach MIN_SIGNAL_STRENGTH before
+        # their mentions are scanned (results are the same either way)
+        self.prefilter = True
         
+        # Compiled once here; see the patterns property
+        self._patterns = PatternRegistry(self.corridor_patterns, self.intent_keywords)
+        
+        self.results = []
+    
+    def __getstate__(self):
+        # Workers get the configuration, not the last document's scratch state
+        state = self.__dict__.copy()
+        state['_last_gazetteer_scan'] = (None, [])
+        return state
+    
+    @property
+    def patterns(self):
+        """Compiled pattern registry, rebuilt only if the configuration was edited"""
+        signature = PatternRegistry.signature_of(self.corridor_patterns, self.intent_keywords)
+        if self._patterns.signature != signature:
+            self._patterns = PatternRegistry(self.corridor_patterns, self.intent_keywords)
+        return self._patterns
+    
     def extract_corridors(self, text):
         """Extract geographic areas and corridors from text"""
         corridors = set()
+        for _, corridor in self.corridor_matches(text):
+            corridors.add(corridor)
+        return list(corridors)
+    
+    def corridor_matches(self, text):
+        """Yield (match start, corridor name) for every corridor found in text"""
+        if self.gazetteer is not None:
+            for start, _, canonical in self._gazetteer_matches(text):
+                yield start, canonical
         
         # Common words to filter out (not actual corridors)
         stop_words = {'the', 'this', 'these', 'those', 'that', 'a', 'an', 'and', 'or', 
                       'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'from'}
         
-        for pattern in self.corridor_patterns:
-            matches = re.finditer(pattern, text)
+        for pattern in self.patterns.corridor_patterns:
+            matches = pattern.finditer(text)
             for match in matches:
                 # Get all captured groups
                 for group in match.groups():
@@ -69,116 +765,281 @@ class MunicipalRezoningTracker:
                         if (corridor.lower() not in stop_words and 
                             len(corridor) > 3 and
                             not corridor.lower() in ['area', 'corridor', 'district', 'street']):
-                            corridors.add(corridor)
+                            if self.gazetteer is not None and self._known_name(corridor):
+                                # A known name, already reported under its canonical
+                                # name ("X Street Corridor", "The X Street"); names
+                                # that only contain one ("X Township Parkway") stay
+                                continue
+                            yield match.start(), corridor
+    
+    def _known_name(self, corridor):
+        """Whether the gazetteer resolves the whole name (apart from a leading "The")"""
+        words = corridor.split(None, 1)
+        if len(words) == 2 and words[0].lower() == 'the':
+            corridor = words[1]
+        return self.gazetteer.canonical(corridor) is not None
+    
+    def _gazetteer_matches(self, text):
+        """Gazetteer matches for a text, reusing the last scan of the same text"""
+        last_text, matches = self._last_gazetteer_scan
+        if last_text is not text:
+            matches = self.gazetteer.find(text)
+            self._last_gazetteer_scan = (text, matches)
+        return matches
+    
+    def build_mention_index(self, text, corridors):
+        """
+        Locate every mention of every corridor, with one str.find scan of the
+        text per corridor (see scan_literals)
+        Returns dict mapping corridor -> list of (start, end) spans, matching
+        what a per-corridor case-insensitive search would find. Corridors known
+        to the gazetteer take their spans (any alias) from the gazetteer scan.
+        """
+        known = {}
+        if self.gazetteer is not None:
+            known = {c: [] for c in corridors if c in self.gazetteer}
+            for start, end, canonical in self._gazetteer_matches(text):
+                if canonical in known:
+                    known[canonical].append((start, end))
         
-        return list(corridors)
+        index = scan_literals(text, [c for c in corridors if c and c not in known])
+        index.update(known)
+        for corridor in corridors:
+            if not corridor:
+                index[corridor] = self._find_mentions(text, corridor)
+        return index
     
-    def calculate_signal_strength(self, text, corridor):
+    def _find_mentions(self, text, corridor):
+        """Spans of case-insensitive mentions of a single corridor"""
+        return [match.span() for match in literal_pattern(corridor).finditer(text)]
+    
+    def calculate_signal_strength(self, text, corridor, mentions=None, keyword_index=None):
         """
         Calculate signal strength for a corridor based on surrounding context
         Returns score 0-100
         """
-        # Create a window around corridor mentions
-        corridor_contexts = []
-        pattern = re.escape(corridor)
+        if mentions is None:
+            mentions = self._find_mentions(text, corridor)
         
-        for match in re.finditer(pattern, text, re.IGNORECASE):
-            start = max(0, match.start() - 300)
-            end = min(len(text), match.end() + 300)
-            corridor_contexts.append(text[start:end].lower())
-        
-        if not corridor_contexts:
+        if not mentions:
             return 0
+        if keyword_index is None:
+            keyword_index = KeywordIndex(text, self.intent_keywords, self.patterns.keyword_scanner)
         
-        score = 0
-        context_text = ' '.join(corridor_contexts)
+        # Keywords in overlapping windows are counted once per window
+        class_counts = self.keyword_class_counts(text, mentions, keyword_index)
+        return self.signal_score(class_counts, len(mentions))
+    
+    def keyword_class_counts(self, text, mentions, keyword_index, window=300):
+        """Keyword hits per category summed over the windows around each mention"""
+        counts = dict.fromkeys(self.intent_keywords, 0)
+        for mention_start, mention_end in mentions:
+            start = max(0, mention_start - window)
+            end = min(len(text), mention_end + window)
+            for category in counts:
+                counts[category] += keyword_index.count(category, start, end)
+        return counts
+    
+    def keyword_counts(self, text, mentions, keyword_index, window=300):
+        """Hits of each intent keyword (that occurs at all) around the mentions"""
+        counts = {}
+        for keyword, starts in keyword_index.positions.items():
+            if not starts:
+                continue
+            total = 0
+            for mention_start, mention_end in mentions:
+                total += keyword_index.count_keyword(
+                    keyword, max(0, mention_start - window), min(len(text), mention_end + window)
+                )
+            if total:
+                counts[keyword] = total
+        return counts
+    
+    def prefilter_corridors(self, text, corridors, keyword_index):
+        """
+        Corridors that can still reach MIN_SIGNAL_STRENGTH
         
-        # High signal keywords (10 points each)
-        for keyword in self.intent_keywords['high_signal']:
-            count = context_text.count(keyword.lower())
-            score += count * 10
+        Each mention window holds at most every keyword hit in the document,
+        so a corridor with m mentions scores at most m * K + min(3m, 20),
+        where K is the document's total weighted keyword hits (and never
+        above 100). That gives the fewest mentions a reportable corridor
+        needs, or none at all. When it is more than one, mentions are counted
+        with str.count, which is far cheaper than the full mention scan.
+        """
+        reach = sum(max(weight, 0) * len(keyword_index.categories[category][0])
+                    for category, weight in self.keyword_weights.items()
+                    if category in keyword_index.categories)
+        needed = self._mentions_needed(reach)
+        if needed is None:
+            return []
+        if needed == 1:
+            return corridors
         
-        # Medium signal keywords (5 points each)
-        for keyword in self.intent_keywords['medium_signal']:
-            count = context_text.count(keyword.lower())
-            score += count * 5
+        gazetteer_counts = Counter()
+        if self.gazetteer is not None:
+            gazetteer_counts.update(canonical for _, _, canonical in self._gazetteer_matches(text))
+        lowered = text.lower() if text.isascii() else None
         
-        # Infrastructure mentions (bonus 8 points each)
-        for keyword in self.intent_keywords['infrastructure']:
-            count = context_text.count(keyword.lower())
-            score += count * 8
+        kept = []
+        for corridor in corridors:
+            if not corridor:
+                kept.append(corridor)
+                continue
+            if self.gazetteer is not None and corridor in self.gazetteer:
+                mentions = gazetteer_counts[corridor]
+            elif lowered is not None:
+                mentions = lowered.count(corridor.lower())
+            else:
+                mentions = len(self._find_mentions(text, corridor))
+            if mentions >= needed:
+                kept.append(corridor)
+        return kept
+    
+    @staticmethod
+    def _mentions_needed(reach):
+        """
+        Fewest mentions m with m * reach + min(3m, 20) >= MIN_SIGNAL_STRENGTH,
+        or None when no count gets there (signal_score caps at 100)
+        """
+        if MIN_SIGNAL_STRENGTH > 100:
+            return None
+        # The frequency bonus grows 3 per mention up to 6 mentions (18 points)
+        needed = max(1, math.ceil(MIN_SIGNAL_STRENGTH / (reach + 3)))
+        if needed <= 6:
+            return needed
+        # From 7 mentions on the bonus is 20 and only the keywords add more
+        if reach <= 0:
+            return 7 if MIN_SIGNAL_STRENGTH <= 20 else None
+        return max(7, math.ceil((MIN_SIGNAL_STRENGTH - 20) / reach))
+    
+    def signal_score(self, class_counts, mention_count):
+        """Combine keyword counts and mention frequency into a 0-100 score"""
+        score = 0
+        # High signal 10 points, medium 5, infrastructure bonus 8 (per hit)
+        for category, weight in self.keyword_weights.items():
+            score += class_counts.get(category, 0) * weight
         
         # Frequency bonus (more mentions = higher confidence)
-        mention_count = len(corridor_contexts)
         score += min(mention_count * 3, 20)  # Cap at 20 points
         
         return min(score, 100)  # Cap at 100
     
-    def extract_timeline_signals(self, text, corridor):
+    def extract_timeline_signals(self, text, corridor, mentions=None):
         """Extract timeline indicators from text"""
-        corridor_contexts = []
-        pattern = re.escape(corridor)
+        if mentions is None:
+            mentions = self._find_mentions(text, corridor)
         
-        for match in re.finditer(pattern, text, re.IGNORECASE):
-            start = max(0, match.start() - 200)
-            end = min(len(text), match.end() + 200)
+        corridor_contexts = []
+        for mention_start, mention_end in mentions:
+            start = max(0, mention_start - 200)
+            end = min(len(text), mention_end + 200)
             corridor_contexts.append(text[start:end])
         
         context_text = ' '.join(corridor_contexts)
         
-        # Look for timeline indicators
-        timeline_patterns = {
-            'immediate': [r'within (\d+) months?', r'by (\d{4})', r'next year', r'immediate'],
-            'near_term': [r'within (\d+) years?', r'short[- ]term', r'upcoming'],
-            'long_term': [r'long[- ]term', r'future', r'eventual', r'phase [2-9]']
-        }
-        
-        timelines = []
-        for category, patterns in timeline_patterns.items():
+        # Look for timeline indicators (most urgent category first)
+        for category, patterns in self.patterns.timeline_patterns:
             for pattern in patterns:
-                if re.search(pattern, context_text, re.IGNORECASE):
-                    timelines.append(category)
-                    break
+                if pattern.search(context_text):
+                    return category
         
-        return timelines[0] if timelines else 'unspecified'
+        return 'unspecified'
     
-    def extract_supporting_evidence(self, text, corridor, max_quotes=3):
+    def extract_supporting_evidence(self, text, corridor, max_quotes=3, mentions=None):
         """Extract relevant quotes mentioning the corridor"""
-        evidence = []
-        pattern = re.escape(corridor)
+        if mentions is None:
+            mentions = self._find_mentions(text, corridor)
         
-        for match in re.finditer(pattern, text, re.IGNORECASE):
-            start = max(0, match.start() - 150)
-            end = min(len(text), match.end() + 150)
+        return [quote for _, _, quote in self.evidence_spans(text, mentions, max_quotes)]
+    
+    def evidence_spans(self, text, mentions, max_quotes=3):
+        """
+        Quotes around corridor mentions, as (mention_start, mention_end, quote)
+        The offsets let callers cite where in the document each quote came from
+        """
+        evidence = []
+        for mention_start, mention_end in mentions:
+            quote = evidence_quote(text, mention_start, mention_end)
+            if quote is not None:
+                evidence.append((mention_start, mention_end, quote))
             
-            quote = text[start:end].strip()
-            # Clean up the quote
-            quote = ' '.join(quote.split())
-            if len(quote) > 50:  # Only keep substantial quotes
-                evidence.append(f"...{quote}...")
-                
             if len(evidence) >= max_quotes:
                 break
         
         return evidence
     
-    def analyze_document(self, document_text, document_name, document_date):
+    def evidence_keyword_hits(self, text, spans, keyword_index, width=150):
+        """Intent keyword hits inside each evidence quote's window"""
+        return [
+            sum(keyword_index.count(category, max(0, start - width), min(len(text), end + width))
+                for category in self.intent_keywords)
+            for start, end, _ in spans
+        ]
+    
+    def analyze_document(self, document_text, document_name, document_date, page_offsets=None,
+                         include_details=False):
         """
         Analyze a single planning document
         Returns list of opportunities found
+        
+        'evidence_offsets' holds [start, end] of the mention behind each quote
+        and 'evidence_keyword_hits' the intent keywords inside each quote.
+        If page_offsets (start offset of each page in the text) is given, each
+        opportunity also lists the page number of every evidence quote.
+        With include_details, each opportunity also carries 'keyword_counts'
+        (intent keyword -> hits in the corridor's context windows).
         """
         opportunities = []
+        stats = self.stats
+        if stats is not None:
+            doc_start = mark = stats.clock()
+            size = len(document_text)
         
         # Extract all corridors mentioned
         corridors = self.extract_corridors(document_text)
+        if stats is not None:
+            mark = stats.lap('extract_corridors', mark, size)
+        
+        keyword_index = KeywordIndex(document_text, self.intent_keywords,
+                                     self.patterns.keyword_scanner)
+        if stats is not None:
+            mark = stats.lap('keyword_index', mark, size)
+        
+        extracted = len(corridors)
+        if self.prefilter and corridors:
+            corridors = self.prefilter_corridors(document_text, corridors, keyword_index)
+            if stats is not None:
+                mark = stats.lap('prefilter', mark)
+                stats.record_prefilter(extracted - len(corridors), 0 if corridors else size,
+                                       document=not corridors)
+            if not corridors:
+                if stats is not None:
+                    stats.record_document(document_name, stats.clock() - doc_start, size, extracted)
+                return opportunities
+        
+        # Find all corridor mentions once; every stage reads its windows from here
+        mention_index = self.build_mention_index(document_text, corridors)
+        if stats is not None:
+            mark = stats.lap('mention_index', mark, size)
         
         for corridor in corridors:
-            signal_strength = self.calculate_signal_strength(document_text, corridor)
+            mentions = mention_index[corridor]
+            if stats is not None:
+                corridor_start = mark
+            signal_strength = self.calculate_signal_strength(
+                document_text, corridor, mentions, keyword_index
+            )
+            if stats is not None:
+                mark = stats.lap('scoring', mark, self._window_bytes(document_text, mentions, 300))
             
             # Only include corridors with meaningful signal
-            if signal_strength >= 15:
-                timeline = self.extract_timeline_signals(document_text, corridor)
-                evidence = self.extract_supporting_evidence(document_text, corridor, max_quotes=2)
+            if signal_strength >= MIN_SIGNAL_STRENGTH:
+                timeline = self.extract_timeline_signals(document_text, corridor, mentions)
+                if stats is not None:
+                    mark = stats.lap('timeline', mark, self._window_bytes(document_text, mentions, 200))
+                spans = self.evidence_spans(document_text, mentions, max_quotes=2)
+                if stats is not None:
+                    mark = stats.lap('evidence', mark)
                 
                 opportunity = {
                     'corridor': corridor,
@@ -186,70 +1047,233 @@ class MunicipalRezoningTracker:
                     'timeline': timeline,
                     'source_document': document_name,
                     'document_date': document_date,
-                    'evidence': evidence
+                    'evidence': [quote for _, _, quote in spans],
+                    'evidence_offsets': [[start, end] for start, end, _ in spans],
+                    'evidence_keyword_hits': self.evidence_keyword_hits(
+                        document_text, spans, keyword_index
+                    )
                 }
+                if page_offsets:
+                    opportunity['evidence_pages'] = [
+                        bisect_right(page_offsets, start) for start, _, _ in spans
+                    ]
+                if include_details:
+                    opportunity['keyword_counts'] = self.keyword_counts(
+                        document_text, mentions, keyword_index
+                    )
                 
                 opportunities.append(opportunity)
+            
+            if stats is not None:
+                stats.record_corridor(document_name, corridor, mark - corridor_start, len(mentions))
+        
+        if stats is not None:
+            stats.record_document(document_name, stats.clock() - doc_start, size, extracted)
         
         return opportunities
     
-    def analyze_documents(self, documents):
+    @staticmethod
+    def _window_bytes(text, mentions, window):
+        """Characters covered by the context windows around mentions"""
+        return sum(min(len(text), end + window) - max(0, start - window) for start, end in mentions)
+    
+    def analyze_documents(self, documents, workers=None, cache=None, top_n=None, index=None,
+                          dedupe=None):
         """
         Analyze multiple documents and aggregate results
         
         Args:
             documents: List of dicts with keys: 'text', 'name', 'date'
+                (optionally 'page_offsets', as produced by pdf_ingestion)
+            workers: Number of processes for per-document analysis (default: serial)
+            cache: Optional ResultCache; unchanged documents are not re-analyzed
+            top_n: Only return the top_n corridors (selected with a bounded heap)
+            index: Optional CorridorIndex to record every opportunity in, for
+                later queries without re-running the analysis
+            dedupe: Optional DuplicateDetector; repeated documents and
+                paragraphs are not analyzed (or scored) again
         """
-        all_opportunities = []
+        aggregator = self.aggregate_documents(documents, workers, cache, index, dedupe)
         
-        for doc in documents:
-            opportunities = self.analyze_document(
-                doc['text'], 
-                doc['name'], 
-                doc['date']
-            )
-            all_opportunities.extend(opportunities)
-        
-        # Aggregate by corridor (a corridor might appear in multiple documents)
-        corridor_data = defaultdict(lambda: {
-            'total_score': 0,
-            'documents': [],
-            'timelines': [],
-            'evidence': []
-        })
-        
-        for opp in all_opportunities:
-            corridor = opp['corridor']
-            corridor_data[corridor]['total_score'] += opp['signal_strength']
-            corridor_data[corridor]['documents'].append({
-                'name': opp['source_document'],
-                'date': opp['document_date'],
-                'score': opp['signal_strength']
-            })
-            corridor_data[corridor]['timelines'].append(opp['timeline'])
-            corridor_data[corridor]['evidence'].extend(opp['evidence'])
-        
-        # Create final ranking
-        ranked_opportunities = []
-        for corridor, data in corridor_data.items():
-            # Determine most urgent timeline
-            timeline_priority = {'immediate': 1, 'near_term': 2, 'long_term': 3, 'unspecified': 4}
-            best_timeline = min(data['timelines'], key=lambda x: timeline_priority.get(x, 4))
-            
-            ranked_opportunities.append({
-                'corridor': corridor,
-                'total_score': data['total_score'],
-                'avg_score': data['total_score'] / len(data['documents']),
-                'num_mentions': len(data['documents']),
-                'timeline': best_timeline,
-                'documents': data['documents'],
-                'evidence': list(set(data['evidence']))[:3]  # Top 3 unique pieces of evidence
-            })
+        if top_n is not None:
+            return aggregator.top(top_n)
+        return aggregator.ranked()
+    
+    def aggregate_documents(self, documents, workers=None, cache=None, index=None, dedupe=None):
+        """
+        Analyze documents into a CorridorAggregator, for callers that want
+        top(n) or page(limit, cursor) access instead of the full ranking
+        """
+        # With the documents at hand, evidence is kept as spans into their text
+        # (not when deduplicating, as the analyzed text may be blanked)
+        texts = documents if isinstance(documents, Sequence) and dedupe is None else None
+        aggregator = CorridorAggregator(texts=texts)
+        
+        if index is None:
+            for opportunities in self.iter_document_opportunities(documents, workers, cache=cache,
+                                                                  dedupe=dedupe):
+                aggregator.add(opportunities)
+            return aggregator
+        
+        # Results come back in input order; remember each document's name and
+        # date so documents without opportunities are indexed (and cleared) too
+        pending = deque()
+        
+        def remembered():
+            for doc in documents:
+                pending.append((doc['name'], doc['date']))
+                yield doc
+        
+        for opportunities in self.iter_document_opportunities(remembered(), workers, cache=cache,
+                                                              include_details=True, dedupe=dedupe):
+            aggregator.add(opportunities)
+            name, date = pending.popleft()
+            # Skipped duplicates stay out of the index: a repeated copy under
+            # the same name would otherwise clear the original's rows
+            if opportunities is not SKIPPED_DOCUMENT:
+                index.add_document(name, date, opportunities)
+        
+        index.commit()
+        return aggregator
+    
+    def analyze_documents_stream(self, documents, every=None, workers=None,
+                                 keep_documents=True, cache=None, dedupe=None):
+        """
+        Analyze an iterable of documents, folding each one into running totals
+        
+        Documents can come from any iterable or generator and are not kept
+        after analysis. Yields the current ranking after every `every`
+        documents (if given) and once more at the end.
+        
+        Args:
+            documents: Iterable of dicts with keys: 'text', 'name', 'date'
+            every: Emit an intermediate ranking after this many documents
+            workers: Number of processes for per-document analysis
+            keep_documents: Keep each corridor's per-document list; turn off to
+                make memory depend only on the number of distinct corridors
+            cache: Optional ResultCache; unchanged documents are not re-analyzed
+            dedupe: Optional DuplicateDetector; repeated documents and
+                paragraphs are not analyzed (or scored) again
+        """
+        aggregator = CorridorAggregator(keep_documents=keep_documents)
+        
+        for opportunities in self.iter_document_opportunities(documents, workers, cache=cache,
+                                                              dedupe=dedupe):
+            aggregator.add(opportunities)
+            if every and aggregator.documents_seen % every == 0:
+                yield aggregator.ranked()
+        
+        if not every or aggregator.documents_seen % every:
+            yield aggregator.ranked()
+    
+    def analyze_momentum(self, documents, momentum=None, workers=None, cache=None, dedupe=None):
+        """
+        Fold documents into time-aware momentum rankings
+        
+        Pass the CorridorMomentum from an earlier call to update it with just
+        the new documents (e.g. today's council minutes); history is never
+        re-analyzed. Returns the CorridorMomentum; call .ranked() on it.
+        """
+        if momentum is None:
+            momentum = CorridorMomentum()
+        for opportunities in self.iter_document_opportunities(documents, workers, cache=cache,
+                                                              dedupe=dedupe):
+            momentum.add(opportunities)
+        return momentum
+    
+    def iter_document_opportunities(self, documents, workers=None, batch_size=256, cache=None,
+                                    include_details=False, dedupe=None):
+        """
+        Yield the opportunity list of each document, in input order
         
-        # Sort by total score
-        ranked_opportunities.sort(key=lambda x: x['total_score'], reverse=True)
+        With workers > 1 documents are analyzed in a process pool. The tracker
+        is sent to each worker once at start-up and documents are submitted in
+        bounded batches, so any iterable (including generators) can be used.
+        With a ResultCache, unchanged documents are served from the cache and
+        only the misses are analyzed. With a DuplicateDetector, documents it
+        skips yield SKIPPED_DOCUMENT (empty, like a document without
+        opportunities) and repeated paragraphs are not analyzed.
+        """
+        fingerprint = self.config_fingerprint() if cache is not None else None
+        documents = iter(documents)
+        pool = None
+        if workers and workers > 1:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                       initargs=(self,))
         
-        return ranked_opportunities
+        try:
+            while True:
+                batch = list(islice(documents, batch_size * workers if pool else 1))
+                if not batch:
+                    break
+                
+                if dedupe is not None:
+                    # MinHash fingerprints are computed in the workers; the
+                    # index lookups run here in input order, so the first copy
+                    # is always the one kept
+                    fingerprints = (pool.map(dedupe.fingerprinter, batch,
+                                             chunksize=max(1, len(batch) // (workers * 4)))
+                                    if pool else [None] * len(batch))
+                    batch = [dedupe.screen(doc, fp) for doc, fp in zip(batch, fingerprints)]
+                
+                # Skipped duplicates (None) have nothing to analyze
+                results = [None if doc is not None else SKIPPED_DOCUMENT for doc in batch]
+                keys = [None] * len(batch)
+                if cache is not None:
+                    for i, doc in enumerate(batch):
+                        if doc is None:
+                            continue
+                        keys[i] = cache.key(doc['text'], fingerprint, doc.get('page_offsets'),
+                                            include_details)
+                        cached = cache.get(keys[i])
+                        if cached is not None:
+                            # Same text, so only the document's own name/date differ
+                            for opp in cached:
+                                opp['source_document'] = doc['name']
+                                opp['document_date'] = doc['date']
+                            results[i] = cached
+                
+                misses = [i for i, result in enumerate(results) if result is None]
+                todo = [batch[i] for i in misses]
+                if pool:
+                    chunksize = max(1, len(todo) // (workers * 4))
+                    analyzed = pool.map(_analyze_in_worker, todo, [include_details] * len(todo),
+                                        chunksize=chunksize)
+                else:
+                    analyzed = (_analyze_with(self, doc, include_details) for doc in todo)
+                
+                if pool:
+                    analyzed = self._merge_worker_stats(analyzed)
+                for i, opportunities in zip(misses, analyzed):
+                    results[i] = opportunities
+                    if cache is not None:
+                        cache.put(keys[i], opportunities)
+                
+                yield from results
+        finally:
+            if pool:
+                pool.shutdown()
+    
+    def _merge_worker_stats(self, results):
+        """Unpack (opportunities, stats) pairs from workers, folding in their stats"""
+        for opportunities, worker_stats in results:
+            if worker_stats is not None and self.stats is not None:
+                self.stats.merge(worker_stats)
+            yield opportunities
+    
+    def config_fingerprint(self):
+        """
+        Hash of everything that affects analyze_document output
+        Cached results are only reused while this stays the same
+        """
+        config = {
+            'version': ANALYSIS_VERSION,
+            'intent_keywords': self.intent_keywords,
+            'keyword_weights': self.keyword_weights,
+            'corridor_patterns': self.corridor_patterns,
+            'gazetteer': self.gazetteer.entries if self.gazetteer is not None else None
+        }
+        return hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()
     
     def generate_report(self, ranked_opportunities, top_n=10):
         """Generate a formatted report of top opportunities"""
@@ -276,24 +1300,77 @@ class MunicipalRezoningTracker:
         
         return "\n".join(report)
     
-    def export_to_csv(self, ranked_opportunities, filename):
-        """Export results to CSV for further analysis"""
-        rows = []
-        for opp in ranked_opportunities:
-            rows.append({
-                'Corridor/Area': opp['corridor'],
-                'Total Score': opp['total_score'],
-                'Average Score': round(opp['avg_score'], 1),
-                'Mentions': opp['num_mentions'],
-                'Timeline': opp['timeline'],
-                'Documents': ', '.join([d['name'] for d in opp['documents']]),
-                'Top Evidence': opp['evidence'][0] if opp['evidence'] else ''
-            })
-        
-        df = pd.DataFrame(rows)
-        df.to_csv(filename, index=False)
-        return df
-
+    CSV_COLUMNS = ['Corridor/Area', 'Total Score', 'Average Score', 'Mentions',
+                   'Timeline', 'Documents', 'Top Evidence']
+    
+    def csv_row(self, opp):
+        """One ranked opportunity as a CSV row (same values as export_to_csv)"""
+        return [
+            opp['corridor'],
+            opp['total_score'],
+            round(opp['avg_score'], 1),
+            opp['num_mentions'],
+            opp['timeline'],
+            ', '.join([d['name'] for d in opp['documents']]),
+            opp['evidence'][0] if opp['evidence'] else ''
+        ]
+    
+    def export_to_csv(self, ranked_opportunities, filename, as_dataframe=True):
+        """
+        Export results to CSV for further analysis
+        
+        Rows are written one at a time, so ranked_opportunities can be any
+        iterable. pandas is only imported when the DataFrame is requested;
+        with as_dataframe=False the number of rows written is returned.
+        """
+        if self.stats is not None:
+            mark = self.stats.clock()
+        
+        rows = [] if as_dataframe else None
+        count = 0
+        with open(filename, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(self.CSV_COLUMNS)
+            for opp in ranked_opportunities:
+                row = self.csv_row(opp)
+                writer.writerow(row)
+                count += 1
+                if rows is not None:
+                    rows.append(row)
+        
+        if self.stats is not None:
+            self.stats.lap('export_csv', mark)
+        
+        if not as_dataframe:
+            return count
+        return self.to_dataframe(rows)
+    
+    def to_dataframe(self, rows):
+        """pandas DataFrame of CSV rows (pandas is imported here, on first use)"""
+        import pandas as pd
+        return pd.DataFrame(rows, columns=self.CSV_COLUMNS)
+    
+    def export_to_jsonl(self, ranked_opportunities, filename):
+        """
+        Export full results (documents and evidence) as JSON Lines, one
+        opportunity per line, streaming from any iterable
+        Returns the number of opportunities written
+        """
+        count = 0
+        with open(filename, 'w', encoding='utf-8') as f:
+            for opp in ranked_opportunities:
+                f.write(json.dumps(opp))
+                f.write('\n')
+                count += 1
+        return count
+    
+    def export_to_snapshot(self, ranked_opportunities, path='rezoning_snapshots', label=None):
+        """
+        Append results as a new run of a columnar ResultSnapshot (needs NumPy)
+        Returns the run id; see result_snapshot for reading columns back
+        """
+        from result_snapshot import ResultSnapshot
+        return ResultSnapshot(path).append(ranked_opportunities, label=label)
 
 if __name__ == "__main__":
     print("Municipal Rezoning Tracker initialized successfully")
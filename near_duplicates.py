@@ -0,0 +1,290 @@
+"""
+Near Duplicates
+---------------
+Finds repeated documents and paragraphs before they are analyzed
+
+Agendas, minutes and amendment packages repeat whole paragraphs. Analyzing
+every copy costs time and also adds each copy to the corridor's total
+score. A DuplicateDetector sits in front of the analysis:
+
+- A document that exactly or nearly repeats an earlier one is skipped.
+- Within other documents, a paragraph that repeats an earlier paragraph is
+  blanked out with spaces. Offsets and page numbers still line up, but
+  its mentions are not counted again.
+
+Every skip is recorded in detector.duplicates, with what it duplicated.
+Fingerprints (the costly part) need no detector state, so with workers the
+tracker computes them in its process pool. Only the index lookups run in
+input order in the parent.
+
+Near duplicates are found with MinHash signatures over word shingles.
+One-permutation hashing means one hash per shingle. LSH banding means
+each lookup only checks the few items that share a band, however many
+documents have been seen.
+
+    detector = DuplicateDetector()
+    ranked = tracker.analyze_documents(documents, dedupe=detector)
+    print(detector.summary())
+"""
+
+import hashlib
+import re
+import zlib
+from operator import eq
+
+WORD = re.compile(r'[a-z0-9]+')
+PARAGRAPH_BREAK = re.compile(r'\n[ \t]*\n\s*')
+NOT_NEWLINE = re.compile(r'[^\n]')
+
+
+def shingle_hashes(words, size=5):
+    """
+    Hashes of the overlapping size-word shingles. Words are hashed with
+    crc32 and shingles as tuples of those ints, which (unlike str hashes)
+    does not change with PYTHONHASHSEED
+    """
+    word_hashes = list(map(zlib.crc32, map(str.encode, words)))
+    if len(word_hashes) <= size:
+        return [hash(tuple(word_hashes))] if word_hashes else []
+    return map(hash, zip(*(word_hashes[i:] for i in range(size))))
+
+
+def minhash(hashes, num_perm=128):
+    """
+    One-permutation MinHash: each hash falls in one of num_perm bins, and
+    a bin keeps its smallest value. Empty bins borrow the next filled bin,
+    offset by the distance, so short texts still have comparable signatures
+    """
+    signature = [None] * num_perm
+    for h in hashes:
+        h &= 0xFFFFFFFF
+        b = h % num_perm
+        value = h // num_perm
+        if signature[b] is None or value < signature[b]:
+            signature[b] = value
+    
+    filled = [b for b in range(num_perm) if signature[b] is not None]
+    if not filled:
+        return tuple(signature)
+    for b in range(num_perm):
+        if signature[b] is None:
+            # Circular distance to the next filled bin
+            distance = next((f - b for f in filled if f > b), filled[0] + num_perm - b)
+            signature[b] = signature[(b + distance) % num_perm] + (distance << 32)
+    return tuple(signature)
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(map(eq, signature, other)) / len(signature)
+
+
+def fingerprint_words(words, shingle_size=5, num_perm=128):
+    """(sha1 digest, MinHash signature) of a word list"""
+    digest = hashlib.sha1(' '.join(words).encode('utf-8')).digest()
+    return digest, minhash(shingle_hashes(words, shingle_size), num_perm)
+
+
+class Fingerprinter:
+    """
+    Picklable fingerprint function with a detector's settings, for worker
+    processes. Returns (document fingerprint, paragraph fingerprints), the
+    latter a list of (start, end, fingerprint) or None when paragraphs are off
+    """
+    
+    def __init__(self, shingle_size=5, num_perm=128, min_paragraph_words=25, paragraphs=True):
+        self.shingle_size = shingle_size
+        self.num_perm = num_perm
+        self.min_paragraph_words = min_paragraph_words
+        self.paragraphs = paragraphs
+    
+    def document(self, text):
+        return fingerprint_words(WORD.findall(text.lower()), self.shingle_size, self.num_perm)
+    
+    def paragraph_list(self, text):
+        found = []
+        for start, end in DuplicateDetector.paragraph_spans(text):
+            words = WORD.findall(text[start:end].lower())
+            # Shorter paragraphs (headings, "Item 4.") are never duplicates
+            if len(words) >= self.min_paragraph_words:
+                found.append((start, end, fingerprint_words(words, self.shingle_size,
+                                                            self.num_perm)))
+        return found
+    
+    def __call__(self, doc):
+        text = doc['text']
+        return self.document(text), self.paragraph_list(text) if self.paragraphs else None
+
+
+class _LSHIndex:
+    """Exact-hash and banded MinHash lookup of previously seen items"""
+    
+    def __init__(self, num_perm, bands, threshold):
+        self.num_perm = num_perm
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.exact = {}
+        self.buckets = {}
+        self.items = []
+    
+    def _bands(self, signature):
+        rows = self.rows
+        return [(band, hash(signature[band * rows:(band + 1) * rows]))
+                for band in range(len(signature) // rows)]
+    
+    def match(self, digest, signature):
+        """(item, similarity) of the best earlier match, or None"""
+        item = self.exact.get(digest)
+        if item is not None:
+            return item, 1.0
+        best = None
+        seen = set()
+        for key in self._bands(signature):
+            for i in self.buckets.get(key, ()):
+                if i in seen:
+                    continue
+                seen.add(i)
+                score = similarity(signature, self.items[i][1])
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (self.items[i][0], score)
+        return best
+    
+    def add(self, digest, signature, item):
+        self.exact.setdefault(digest, item)
+        i = len(self.items)
+        self.items.append((item, signature))
+        for key in self._bands(signature):
+            self.buckets.setdefault(key, []).append(i)
+
+
+class DuplicateDetector:
+    """
+    Document- and paragraph-level duplicate filter for tracker documents
+    
+    State is kept between calls, so one detector can screen a stream of
+    batches (e.g. each day's new minutes) against everything seen before.
+    
+    Args:
+        threshold: Estimated Jaccard similarity at which a document or
+            paragraph counts as a duplicate
+        num_perm: MinHash signature length
+        bands: LSH bands (num_perm must be a multiple)
+        shingle_size: Words per shingle
+        min_paragraph_words: Shorter paragraphs (headings, "Item 4.") are
+            never treated as duplicates
+        paragraphs: Also blank repeated paragraphs, not just whole documents
+    """
+    
+    def __init__(self, threshold=0.8, num_perm=128, bands=32, shingle_size=5,
+                 min_paragraph_words=25, paragraphs=True):
+        if num_perm % bands:
+            raise ValueError('num_perm must be a multiple of bands')
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.min_paragraph_words = min_paragraph_words
+        self.paragraphs = paragraphs
+        self.fingerprinter = Fingerprinter(shingle_size, num_perm, min_paragraph_words, paragraphs)
+        self.document_index = _LSHIndex(num_perm, bands, threshold)
+        self.paragraph_index = _LSHIndex(num_perm, bands, threshold)
+        
+        self.duplicates = []
+        self.documents_seen = 0
+        self.documents_skipped = 0
+        self.paragraphs_skipped = 0
+        self.characters_skipped = 0
+    
+    def screen(self, doc, fingerprint=None):
+        """
+        The document to analyze: doc itself, a copy with repeated paragraphs
+        blanked, or None when the whole document is a duplicate
+        
+        fingerprint is self.fingerprinter(doc) if already computed (e.g. in a
+        worker process); otherwise it is computed here, as far as needed.
+        """
+        self.documents_seen += 1
+        text = doc['text']
+        if fingerprint is None:
+            digest, signature = self.fingerprinter.document(text)
+            paragraphs = None
+        else:
+            (digest, signature), paragraphs = fingerprint
+        
+        match = self.document_index.match(digest, signature)
+        if match is not None:
+            original, score = match
+            self.documents_skipped += 1
+            self.characters_skipped += len(text)
+            self.duplicates.append({
+                'document': doc['name'],
+                'kind': 'document',
+                'duplicate_of': original,
+                'similarity': round(score, 3)
+            })
+            return None
+        self.document_index.add(digest, signature, doc['name'])
+        
+        if not self.paragraphs:
+            return doc
+        
+        if paragraphs is None:
+            paragraphs = self.fingerprinter.paragraph_list(text)
+        blanked = []
+        for start, end, (digest, signature) in paragraphs:
+            match = self.paragraph_index.match(digest, signature)
+            if match is None:
+                self.paragraph_index.add(digest, signature, (doc['name'], start, end))
+                continue
+            (original, original_start, original_end), score = match
+            blanked.append((start, end))
+            self.duplicates.append({
+                'document': doc['name'],
+                'kind': 'paragraph',
+                'start': start,
+                'end': end,
+                'duplicate_of': original,
+                'duplicate_of_start': original_start,
+                'duplicate_of_end': original_end,
+                'similarity': round(score, 3)
+            })
+        
+        if not blanked:
+            return doc
+        # Same length, so mention offsets and page_offsets still line up
+        parts = []
+        previous = 0
+        for start, end in blanked:
+            parts.append(text[previous:start])
+            parts.append(NOT_NEWLINE.sub(' ', text[start:end]))
+            previous = end
+        parts.append(text[previous:])
+        self.paragraphs_skipped += len(blanked)
+        self.characters_skipped += sum(end - start for start, end in blanked)
+        
+        screened = dict(doc)
+        screened['text'] = ''.join(parts)
+        return screened
+    
+    @staticmethod
+    def paragraph_spans(text):
+        """(start, end) of each blank-line separated paragraph"""
+        start = 0
+        for match in PARAGRAPH_BREAK.finditer(text):
+            if match.start() > start:
+                yield start, match.start()
+            start = match.end()
+        end = len(text.rstrip())
+        if end > start:
+            yield start, end
+    
+    def filter(self, documents):
+        """screen() over an iterable of documents (None for skipped ones)"""
+        for doc in documents:
+            yield self.screen(doc)
+    
+    def summary(self):
+        return {
+            'documents_seen': self.documents_seen,
+            'documents_skipped': self.documents_skipped,
+            'paragraphs_skipped': self.paragraphs_skipped,
+            'characters_skipped': self.characters_skipped
+        }
@@ -0,0 +1,267 @@
+"""
+Parcel Join
+-----------
+Attaches county parcels to ranked corridors
+
+A parcel CSV (millions of rows) is streamed once into an on-disk SQLite
+index. Each parcel gets a normalized street key ("1234 N TRYON ST" ->
+"north tryon street"). When the CSV has centroid coordinates, parcels also
+get grid cells, so "parcels within 250 m of the corridor" is answered from
+neighbouring cells instead of a full scan. The source file's size and
+mtime are recorded, and repeat builds skip the CSV entirely.
+
+    index = ParcelIndex('parcel_index.sqlite')
+    index.build('mecklenburg_parcels.csv', id_column='PID', address_column='SITUS_ADDR',
+                x_column='X', y_column='Y')
+    opportunities = attach_parcels(tracker.analyze_documents(documents), index)
+"""
+
+import csv
+import math
+import os
+import re
+import sqlite3
+from itertools import islice
+
+from corridor_gazetteer import GENERIC_SUFFIXES
+
+STREET_WORD = re.compile(r'[a-z0-9]+')
+DEFAULT_CELL_SIZE = 500.0
+
+# USPS-style abbreviations -> the words corridor names use
+STREET_ABBREVIATIONS = {
+    'st': 'street', 'str': 'street', 'rd': 'road', 'ave': 'avenue', 'av': 'avenue',
+    'blvd': 'boulevard', 'dr': 'drive', 'pkwy': 'parkway', 'pky': 'parkway',
+    'hwy': 'highway', 'ln': 'lane', 'ct': 'court', 'pl': 'place', 'cir': 'circle',
+    'trl': 'trail', 'ter': 'terrace', 'expy': 'expressway', 'fwy': 'freeway',
+    'n': 'north', 's': 'south', 'e': 'east', 'w': 'west',
+    'ne': 'northeast', 'nw': 'northwest', 'se': 'southeast', 'sw': 'southwest'
+}
+UNIT_WORDS = {'unit', 'apt', 'ste', 'suite', 'bldg', 'lot', 'rm'}
+
+
+def normalize_street(name):
+    """
+    Street key for an address or corridor name: lowercase, abbreviations
+    expanded, house number, unit and trailing "corridor"/"area" dropped
+    """
+    words = STREET_WORD.findall(name.split('#')[0].lower())
+    # House numbers ("1234", "1234a") lead the address
+    while words and any(ch.isdigit() for ch in words[0]):
+        words = words[1:]
+    for i, word in enumerate(words):
+        if word in UNIT_WORDS:
+            words = words[:i]
+            break
+    if words and words[0] == 'the':
+        words = words[1:]
+    while words and words[-1] in GENERIC_SUFFIXES:
+        words = words[:-1]
+    return ' '.join(STREET_ABBREVIATIONS.get(word, word) for word in words)
+
+
+class ParcelIndex:
+    """
+    SQLite index of parcels by normalized street (and grid cell)
+    
+    Args:
+        path: Index database file
+        cell_size: Grid cell size in the CSV's coordinate units (e.g. feet
+            for State Plane); only used when coordinates are present. A size
+            other than the index's own makes the next build() rebuild it.
+            Default: the size the index was built with, else 500
+    """
+    
+    def __init__(self, path='parcel_index.sqlite', cell_size=None):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS parcels (
+                parcel_id TEXT NOT NULL,
+                address TEXT NOT NULL,
+                street_key TEXT NOT NULL,
+                x REAL,
+                y REAL,
+                cell_x INTEGER,
+                cell_y INTEGER
+            );
+        ''')
+        stored = self._meta('cell_size')
+        # Cells stored in the index are in this size until the next build
+        self.indexed_cell_size = float(stored) if stored is not None else None
+        if cell_size is not None:
+            self.cell_size = float(cell_size)
+        else:
+            self.cell_size = self.indexed_cell_size or DEFAULT_CELL_SIZE
+    
+    def _meta(self, key):
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+    
+    def build(self, csv_path, id_column='parcel_id', address_column='address',
+              x_column=None, y_column=None, batch_size=10000, force=False):
+        """
+        Stream a parcel CSV into the index; returns the number of parcels
+        
+        Skipped (returning the stored count) when the same file, unchanged
+        since the last build, was indexed with the same columns and cell size.
+        """
+        stat = os.stat(csv_path)
+        source = repr((os.path.abspath(csv_path), stat.st_size, stat.st_mtime_ns,
+                       id_column, address_column, x_column, y_column, self.cell_size))
+        if not force and self._meta('source') == source:
+            return int(self._meta('parcels'))
+        
+        conn = self.conn
+        conn.execute('PRAGMA synchronous=OFF')
+        # Indexes are rebuilt after the bulk load, which is much faster
+        conn.executescript('''
+            DROP INDEX IF EXISTS parcels_street;
+            DROP INDEX IF EXISTS parcels_cell;
+            DELETE FROM parcels;
+            DELETE FROM meta;
+        ''')
+        
+        spatial = x_column is not None and y_column is not None
+        count = 0
+        with open(csv_path, newline='', encoding='utf-8', errors='replace') as f:
+            rows = csv.DictReader(f)
+            while True:
+                batch = []
+                for row in islice(rows, batch_size):
+                    address = row.get(address_column) or ''
+                    x = y = cell_x = cell_y = None
+                    if spatial:
+                        try:
+                            x, y = float(row[x_column]), float(row[y_column])
+                            cell_x, cell_y = self.cell(x, y)
+                        except (TypeError, ValueError):
+                            x = y = None
+                    batch.append((row.get(id_column) or '', address, normalize_street(address),
+                                  x, y, cell_x, cell_y))
+                if not batch:
+                    break
+                conn.executemany('INSERT INTO parcels VALUES (?, ?, ?, ?, ?, ?, ?)', batch)
+                count += len(batch)
+        
+        conn.executescript('''
+            CREATE INDEX parcels_street ON parcels (street_key);
+            CREATE INDEX parcels_cell ON parcels (cell_x, cell_y);
+        ''')
+        conn.executemany('INSERT INTO meta VALUES (?, ?)', [
+            ('source', source), ('parcels', str(count)), ('cell_size', repr(self.cell_size))
+        ])
+        conn.commit()
+        conn.execute('PRAGMA synchronous=NORMAL')
+        self.indexed_cell_size = self.cell_size
+        return count
+    
+    def cell(self, x, y, size=None):
+        size = size or self.cell_size
+        return math.floor(x / size), math.floor(y / size)
+    
+    def parcels_on(self, street, limit=None):
+        """
+        Parcels whose street matches a corridor/street name. A name without
+        a street type ("Eastway") matches every street that starts with it
+        """
+        key = normalize_street(street)
+        if not key:
+            return []
+        sql = ('SELECT parcel_id, address, x, y FROM parcels '
+               'WHERE street_key = ? OR (street_key >= ? AND street_key < ?) '
+               'ORDER BY street_key, address, parcel_id')
+        params = [key, key + ' ', key + ' \uffff']
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return [self._parcel(row) for row in self.conn.execute(sql, params)]
+    
+    def parcels_near(self, points, radius):
+        """Parcels whose centroid lies within radius of any of the points"""
+        size = self.indexed_cell_size or self.cell_size
+        reach = int(math.ceil(radius / size))
+        cells = set()
+        for x, y in points:
+            cx, cy = self.cell(x, y, size)
+            cells.update((cx + dx, cy + dy) for dx in range(-reach, reach + 1)
+                         for dy in range(-reach, reach + 1))
+        
+        # Points grouped by cell, so each candidate is only checked nearby
+        by_cell = {}
+        for x, y in points:
+            by_cell.setdefault(self.cell(x, y, size), []).append((x, y))
+        found = []
+        radius_sq = radius * radius
+        for cx, cy in sorted(cells):
+            for row in self.conn.execute(
+                    'SELECT parcel_id, address, x, y FROM parcels WHERE cell_x = ? AND cell_y = ?',
+                    (cx, cy)):
+                px, py = row[2], row[3]
+                if any((px - x) ** 2 + (py - y) ** 2 <= radius_sq
+                       for dx in range(-reach, reach + 1) for dy in range(-reach, reach + 1)
+                       for x, y in by_cell.get((cx + dx, cy + dy), ())):
+                    found.append(self._parcel(row))
+        return found
+    
+    @staticmethod
+    def _parcel(row):
+        parcel_id, address, x, y = row
+        parcel = {'parcel_id': parcel_id, 'address': address}
+        if x is not None:
+            parcel['x'] = x
+            parcel['y'] = y
+        return parcel
+    
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM parcels').fetchone()[0]
+    
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_parcels(ranked_opportunities, index, gazetteer=None, radius=None,
+                   max_parcels=None):
+    """
+    Ranked opportunities with 'parcels' and 'parcel_count' added
+    
+    Args:
+        ranked_opportunities: Output of analyze_documents
+        index: Built ParcelIndex
+        gazetteer: Optional CorridorGazetteer; parcels on any alias of a
+            corridor are matched too
+        radius: Also include parcels within this distance of the corridor's
+            own parcels (needs coordinates in the index)
+        max_parcels: Cap on parcels listed per corridor (parcel_count is
+            always the full number)
+    """
+    joined = []
+    for opp in ranked_opportunities:
+        names = [opp['corridor']]
+        if gazetteer is not None and opp['corridor'] in gazetteer:
+            names = gazetteer.aliases(opp['corridor'])
+        
+        parcels = {}
+        for name in names:
+            for parcel in index.parcels_on(name):
+                parcels.setdefault((parcel['parcel_id'], parcel['address']), parcel)
+        if radius:
+            points = [(p['x'], p['y']) for p in parcels.values() if 'x' in p]
+            for parcel in index.parcels_near(points, radius):
+                parcels.setdefault((parcel['parcel_id'], parcel['address']), parcel)
+        
+        listed = list(parcels.values())
+        opp = dict(opp)
+        opp['parcel_count'] = len(listed)
+        opp['parcels'] = listed[:max_parcels] if max_parcels is not None else listed
+        joined.append(opp)
+    return joined
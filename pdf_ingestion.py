@@ -0,0 +1,279 @@
+"""
+PDF Ingestion
+-------------
+Turns a directory of planning PDFs into tracker documents
+
+- Pages are extracted in parallel across processes (large PDFs are split
+  into page ranges, so one long plan doesn't hold up a whole worker)
+- Extracted text is cached by file content hash; files whose size and mtime
+  haven't changed are never opened again
+- Each document records the start offset of every page ('page_offsets'),
+  which analyze_document uses to cite page numbers for evidence
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+from PyPDF2 import PdfReader
+
+PAGE_SEPARATOR = '\n'
+
+
+def find_pdfs(directory, recursive=True):
+    """Sorted paths of the PDF files under a directory"""
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        paths.extend(os.path.join(root, f) for f in files if f.lower().endswith('.pdf'))
+        if not recursive:
+            break
+    return sorted(paths)
+
+
+def file_hash(path, block_size=1 << 20):
+    """sha256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _pdf_date(reader, path):
+    """Document date from PDF metadata, falling back to the file's mtime"""
+    try:
+        created = reader.metadata.get('/CreationDate') if reader.metadata else None
+    except Exception:
+        created = None
+    if created:
+        # PDF dates look like D:20241015093000-04'00'
+        digits = str(created)
+        digits = (digits[2:] if digits.startswith('D:') else digits)[:8]
+        try:
+            return datetime.strptime(digits, '%Y%m%d').strftime('%Y-%m-%d')
+        except ValueError:
+            pass
+    return datetime.fromtimestamp(os.path.getmtime(path)).strftime('%Y-%m-%d')
+
+
+def _error_text(error):
+    return f'{type(error).__name__}: {error}'
+
+
+def _read_info(path):
+    """
+    (page count, date, None) of a PDF, or (0, None, error) when it can't be
+    read (runs in a worker)
+    """
+    try:
+        reader = PdfReader(path)
+        return len(reader.pages), _pdf_date(reader, path), None
+    except Exception as e:
+        return 0, None, _error_text(e)
+
+
+def _extract_range(task):
+    """
+    (texts, None) of pages [start, stop) of a PDF, or (None, error) when
+    extraction fails (runs in a worker)
+    """
+    path, start, stop = task
+    try:
+        reader = PdfReader(path)
+        return [reader.pages[i].extract_text() or '' for i in range(start, stop)], None
+    except Exception as e:
+        return None, _error_text(e)
+
+
+def join_pages(pages):
+    """Document text and the start offset of each page within it"""
+    offsets = []
+    position = 0
+    for page in pages:
+        offsets.append(position)
+        position += len(page) + len(PAGE_SEPARATOR)
+    return PAGE_SEPARATOR.join(pages), offsets
+
+
+def read_pdf_document(path):
+    """One PDF as a tracker document, extracted in this process"""
+    reader = PdfReader(path)
+    text, offsets = join_pages([page.extract_text() or '' for page in reader.pages])
+    return {
+        'text': text,
+        'name': os.path.splitext(os.path.basename(path))[0],
+        'date': _pdf_date(reader, path),
+        'page_offsets': offsets
+    }
+
+
+class PdfTextCache:
+    """
+    SQLite cache of extracted page text
+    
+    Text is stored once per content hash. A second table remembers each
+    path's size and mtime, so unchanged files are recognized without even
+    hashing them; touched-but-identical files only cost a hash.
+    """
+    
+    def __init__(self, path='pdf_text_cache.sqlite'):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT NOT NULL
+            )
+        ''')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS texts (
+                sha256 TEXT PRIMARY KEY,
+                pages TEXT NOT NULL,
+                date TEXT NOT NULL
+            )
+        ''')
+    
+    def lookup(self, path):
+        """
+        Returns (hit, sha256) where hit is the cached (pages, date) or None
+        The hash is returned on a miss too, so the file is only hashed once
+        """
+        stat = os.stat(path)
+        row = self.conn.execute(
+            'SELECT sha256 FROM files WHERE path = ? AND size = ? AND mtime_ns = ?',
+            (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        ).fetchone()
+        sha = row[0] if row else file_hash(path)
+        
+        cached = self.conn.execute(
+            'SELECT pages, date FROM texts WHERE sha256 = ?', (sha,)
+        ).fetchone()
+        if cached is None:
+            return None, sha
+        if row is None:
+            self._remember(path, stat, sha)
+        return (json.loads(cached[0]), cached[1]), sha
+    
+    def store(self, path, sha, pages, date):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO texts (sha256, pages, date) VALUES (?, ?, ?)',
+            (sha, json.dumps(pages), date)
+        )
+        self._remember(path, os.stat(path), sha)
+        self.conn.commit()
+    
+    def _remember(self, path, stat, sha):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO files (path, size, mtime_ns, sha256) VALUES (?, ?, ?, ?)',
+            (os.path.abspath(path), stat.st_size, stat.st_mtime_ns, sha)
+        )
+    
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_pdf_documents(directory, workers=None, cache=None, pages_per_task=16,
+                       files_per_batch=32, recursive=True, failures=None):
+    """
+    Yield tracker documents for every PDF under a directory, in path order
+    
+    Each document is a dict with 'text', 'name', 'date' and 'page_offsets',
+    ready for MunicipalRezoningTracker.analyze_documents (or its streaming
+    variant). Files are processed in batches, so documents start flowing
+    before the whole directory has been parsed. A PDF that can't be read
+    (corrupt, encrypted, truncated) is skipped and the rest carry on.
+    
+    Args:
+        directory: Folder of planning PDFs
+        workers: Number of extraction processes (default: one per CPU)
+        cache: Optional PdfTextCache; unchanged PDFs are not parsed again
+        pages_per_task: Page range size handed to each worker task
+        files_per_batch: Files read ahead of the document being yielded
+        failures: Optional list; a {'path', 'error'} dict is appended for
+            every skipped PDF
+    """
+    paths = iter(find_pdfs(directory, recursive))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            batch = list(islice(paths, files_per_batch))
+            if not batch:
+                break
+            
+            found = {}
+            hashes = {}
+            # Files that vanished or can't be opened since find_pdfs
+            errors = {}
+            if cache is not None:
+                for path in batch:
+                    try:
+                        hit, hashes[path] = cache.lookup(path)
+                    except OSError as e:
+                        errors[path] = _error_text(e)
+                        continue
+                    if hit is not None:
+                        found[path] = hit
+            
+            misses = [path for path in batch if path not in found and path not in errors]
+            infos = dict(zip(misses, pool.map(_read_info, misses)))
+            errors.update((path, info[2]) for path, info in infos.items() if info[2] is not None)
+            
+            # Split every uncached PDF into page ranges and extract them all at once
+            tasks = [
+                (path, start, min(start + pages_per_task, infos[path][0]))
+                for path in misses if path not in errors
+                for start in range(0, infos[path][0], pages_per_task)
+            ]
+            pages = {path: [] for path in misses}
+            for (path, _, _), (text, error) in zip(tasks, pool.map(_extract_range, tasks)):
+                if error is not None:
+                    errors.setdefault(path, error)
+                elif path not in errors:
+                    pages[path].extend(text)
+            
+            for path in misses:
+                if path in errors:
+                    continue
+                date = infos[path][1]
+                found[path] = (pages[path], date)
+                if cache is not None:
+                    try:
+                        cache.store(path, hashes[path], pages[path], date)
+                    except OSError:
+                        # Removed after extraction; the text is still good
+                        pass
+            if failures is not None:
+                failures.extend({'path': path, 'error': errors[path]}
+                                for path in batch if path in errors)
+            
+            for path in batch:
+                if path not in found:
+                    continue
+                page_texts, date = found[path]
+                text, offsets = join_pages(page_texts)
+                yield {
+                    'text': text,
+                    'name': os.path.splitext(os.path.basename(path))[0],
+                    'date': date,
+                    'page_offsets': offsets
+                }
+
+
+def load_pdf_documents(directory, workers=None, cache_path='pdf_text_cache.sqlite'):
+    """Convenience wrapper: all PDFs in a directory as a list of documents"""
+    with PdfTextCache(cache_path) as cache:
+        return list(iter_pdf_documents(directory, workers=workers, cache=cache))
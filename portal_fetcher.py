@@ -0,0 +1,613 @@
+"""
+Portal Fetcher
+--------------
+Collects planning documents from a portal (or a local mirror of one) over HTTP
+
+An asyncio crawler starts from an index page and follows its links. Index
+pages under the same path lead to more links. Document files (.txt, .md,
+.pdf) become tracker documents. Only the standard library is used:
+
+- Keep-alive connections are pooled per host, with a cap on open
+  connections and on requests in flight.
+- Documents seen before are revalidated with If-None-Match /
+  If-Modified-Since; a 304 reuses the stored copy from a FetchCache.
+- Connection errors, timeouts, 429 and 5xx answers are retried with
+  exponential backoff (honouring Retry-After).
+
+iter_portal_documents runs the crawler on a background thread. Documents
+are yielded as they arrive, so analysis starts before the crawl finishes:
+
+    with FetchCache() as cache:
+        documents = iter_portal_documents('http://127.0.0.1:8000/agendas/', cache=cache)
+        ranked = tracker.analyze_documents(documents)
+
+For a local stand-in portal, serve a mirrored folder:
+
+    python portal_fetcher.py --serve-mirror portal_mirror/ --port 8000
+    python portal_fetcher.py http://127.0.0.1:8000/ --top 10
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import queue
+import random
+import sqlite3
+import ssl
+import threading
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from functools import partial
+from html.parser import HTMLParser
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urldefrag, urljoin, urlsplit
+
+DOCUMENT_EXTENSIONS = ('.txt', '.md', '.pdf')
+INDEX_EXTENSIONS = ('', '.html', '.htm')
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+
+class FetchError(Exception):
+    """A URL that could not be fetched, even after retries"""
+
+
+class _LinkParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.links = []
+    
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            for name, value in attrs:
+                if name == 'href' and value:
+                    self.links.append(value)
+
+
+def extract_links(html, base_url):
+    """Absolute URLs (fragments dropped) of the <a href> links in a page"""
+    parser = _LinkParser()
+    parser.feed(html)
+    return [urldefrag(urljoin(base_url, link))[0] for link in parser.links]
+
+
+class Response:
+    __slots__ = ('url', 'status', 'headers', 'body')
+    
+    def __init__(self, url, status, headers, body):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+    
+    def text(self):
+        charset = 'utf-8'
+        for part in self.headers.get('content-type', '').split(';')[1:]:
+            name, _, value = part.strip().partition('=')
+            if name.lower() == 'charset' and value:
+                charset = value.strip('"')
+        try:
+            return self.body.decode(charset, errors='replace')
+        except LookupError:
+            return self.body.decode('utf-8', errors='replace')
+
+
+class _HostPool:
+    """Idle keep-alive connections to one host, at most `limit` open at once"""
+    
+    def __init__(self, host, port, use_ssl, limit):
+        self.host = host
+        self.port = port
+        self.ssl = ssl.create_default_context() if use_ssl else None
+        self.slots = asyncio.Semaphore(limit)
+        self.idle = []
+    
+    async def acquire(self):
+        """(reader, writer, reused) for a free connection"""
+        await self.slots.acquire()
+        while self.idle:
+            reader, writer = self.idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer, True
+            writer.close()
+        try:
+            reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        except BaseException:
+            self.slots.release()
+            raise
+        return reader, writer, False
+    
+    def release(self, reader, writer, reusable):
+        if reusable and not writer.is_closing():
+            self.idle.append((reader, writer))
+        else:
+            writer.close()
+        self.slots.release()
+    
+    def close(self):
+        for _, writer in self.idle:
+            writer.close()
+        self.idle.clear()
+
+
+async def _read_response(reader, method):
+    """(version, status, headers, body, reusable) of one HTTP/1.x response"""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionResetError('connection closed before the response')
+    version, status, *_ = line.decode('latin-1').split(None, 2)
+    status = int(status)
+    
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    
+    delimited = True
+    if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+        body = b''
+    elif 'chunked' in headers.get('transfer-encoding', '').lower():
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0].strip(), 16)
+            if size == 0:
+                # Trailers end with an empty line
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b''.join(chunks)
+    elif 'content-length' in headers:
+        body = await reader.readexactly(int(headers['content-length']))
+    else:
+        body = await reader.read()
+        delimited = False
+    
+    reusable = (delimited and version == 'HTTP/1.1'
+                and headers.get('connection', '').lower() != 'close')
+    return version, status, headers, body, reusable
+
+
+class PortalFetcher:
+    """
+    Pooled, rate-limited HTTP client and crawler for a planning portal
+    
+    Args:
+        concurrency: Requests in flight at once (over all hosts)
+        connections_per_host: Keep-alive connections kept per host
+        retries: Extra attempts after a failed request
+        backoff: First retry delay in seconds (doubled each attempt, jittered)
+        timeout: Seconds allowed for one request
+        cache: Optional FetchCache for conditional requests
+        extensions: Link suffixes treated as documents
+        user_agent: User-Agent header sent with every request
+    """
+    
+    def __init__(self, concurrency=8, connections_per_host=4, retries=3, backoff=0.5,
+                 timeout=30.0, cache=None, extensions=DOCUMENT_EXTENSIONS,
+                 user_agent='municipal-rezoning-tracker'):
+        self.concurrency = concurrency
+        self.connections_per_host = connections_per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = cache
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.user_agent = user_agent
+        
+        self._pools = {}
+        self._limit = None
+        self.errors = []
+        self.counts = {'requests': 0, 'retries': 0, 'fetched': 0, 'not_modified': 0,
+                       'failed': 0, 'connections': 0, 'bytes': 0}
+    
+    def _pool(self, url):
+        parts = urlsplit(url)
+        use_ssl = parts.scheme == 'https'
+        port = parts.port or (443 if use_ssl else 80)
+        key = (parts.hostname, port, use_ssl)
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = _HostPool(parts.hostname, port, use_ssl,
+                                                self.connections_per_host)
+        return pool
+    
+    async def _request_once(self, url, headers):
+        parts = urlsplit(url)
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+        lines = [f'GET {target} HTTP/1.1', f'Host: {parts.netloc}',
+                 f'User-Agent: {self.user_agent}', 'Connection: keep-alive']
+        lines.extend(f'{name}: {value}' for name, value in headers.items())
+        request = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+        
+        pool = self._pool(url)
+        # A pooled connection the server has since closed fails on first use;
+        # that is retried at once on a fresh connection
+        for _ in range(2):
+            reader, writer, reused = await pool.acquire()
+            if not reused:
+                self.counts['connections'] += 1
+            reusable = False
+            try:
+                writer.write(request)
+                await writer.drain()
+                _, status, response_headers, body, reusable = await _read_response(reader, 'GET')
+            except (ConnectionError, asyncio.IncompleteReadError):
+                if reused:
+                    continue
+                raise
+            finally:
+                pool.release(reader, writer, reusable)
+            self.counts['bytes'] += len(body)
+            return Response(url, status, response_headers, body)
+        raise ConnectionResetError('keep-alive connection dropped')
+    
+    async def get(self, url, headers=None, max_redirects=5):
+        """GET with retries, backoff and redirects; raises FetchError"""
+        headers = dict(headers or {})
+        if self._limit is None:
+            self._limit = asyncio.Semaphore(self.concurrency)
+        attempt = 0
+        while True:
+            self.counts['requests'] += 1
+            try:
+                async with self._limit:
+                    response = await asyncio.wait_for(self._request_once(url, headers),
+                                                      self.timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+                error, delay = f'{type(e).__name__}: {e}', None
+            else:
+                if response.status in REDIRECT_STATUSES and 'location' in response.headers:
+                    if max_redirects <= 0:
+                        raise FetchError(f'{url}: too many redirects')
+                    url = urljoin(url, response.headers['location'])
+                    max_redirects -= 1
+                    continue
+                if response.status not in RETRY_STATUSES:
+                    return response
+                error = f'HTTP {response.status}'
+                retry_after = response.headers.get('retry-after', '')
+                delay = float(retry_after) if retry_after.isdigit() else None
+            
+            if attempt >= self.retries:
+                raise FetchError(f'{url}: {error} (after {attempt + 1} attempts)')
+            if delay is None:
+                delay = self.backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+            attempt += 1
+            self.counts['retries'] += 1
+            await asyncio.sleep(delay)
+    
+    def is_document(self, url):
+        return urlsplit(url).path.lower().endswith(self.extensions)
+    
+    async def fetch_document(self, url):
+        """
+        (document, changed) for a URL; a conditional request with the
+        cache's validators returns the stored document when unchanged
+        """
+        stored = self.cache.lookup(url) if self.cache is not None else None
+        headers = {}
+        if stored is not None:
+            etag, last_modified, document = stored
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        
+        response = await self.get(url, headers)
+        if response.status == 304 and stored is not None:
+            self.counts['not_modified'] += 1
+            return stored[2], False
+        if response.status != 200:
+            raise FetchError(f'{url}: HTTP {response.status}')
+        
+        # PDF text extraction is CPU-bound; on the event loop it would stall
+        # every other fetch in flight
+        document = await asyncio.get_running_loop().run_in_executor(
+            None, response_document, response
+        )
+        self.counts['fetched'] += 1
+        if self.cache is not None:
+            self.cache.store(url, response.headers.get('etag'),
+                             response.headers.get('last-modified'), document)
+        return document, True
+    
+    async def crawl(self, index_url, max_depth=2, changed_only=False, prefetch=32):
+        """
+        Async generator of tracker documents linked from an index page
+        
+        Index pages (no extension or .html) under the index URL's directory
+        are followed up to max_depth links deep. Documents are yielded as they
+        arrive; failures are collected in self.errors instead of stopping the
+        crawl. With changed_only, documents a 304 showed to be unchanged are
+        not yielded.
+        """
+        self._limit = asyncio.Semaphore(self.concurrency)
+        scope = index_url if index_url.endswith('/') else index_url.rsplit('/', 1)[0] + '/'
+        documents = asyncio.Queue(maxsize=prefetch)
+        seen = {index_url}
+        outstanding = 0
+        tasks = set()
+        
+        def schedule(coroutine, url):
+            nonlocal outstanding
+            outstanding += 1
+            task = asyncio.ensure_future(run(coroutine, url))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        
+        async def run(coroutine, url):
+            nonlocal outstanding
+            try:
+                await coroutine
+            except Exception as e:
+                # One bad link (or unreadable PDF) doesn't stop the crawl
+                self.counts['failed'] += 1
+                self.errors.append({'url': url, 'error': str(e) if isinstance(e, FetchError)
+                                    else f'{url}: {type(e).__name__}: {e}'})
+            finally:
+                outstanding -= 1
+                if outstanding == 0:
+                    await documents.put(None)
+        
+        async def visit(url, depth):
+            response = await self.get(url)
+            if response.status != 200:
+                raise FetchError(f'{url}: HTTP {response.status}')
+            for link in extract_links(response.text(), response.url):
+                if link in seen or not link.startswith(scope):
+                    continue
+                seen.add(link)
+                if self.is_document(link):
+                    schedule(collect(link), link)
+                elif depth < max_depth and os.path.splitext(urlsplit(link).path)[1].lower() in INDEX_EXTENSIONS:
+                    schedule(visit(link, depth + 1), link)
+        
+        async def collect(url):
+            document, changed = await self.fetch_document(url)
+            if changed or not changed_only:
+                await documents.put(document)
+        
+        schedule(visit(index_url, 0), index_url)
+        try:
+            while True:
+                document = await documents.get()
+                if document is None:
+                    break
+                yield document
+        finally:
+            for task in list(tasks):
+                task.cancel()
+            self.close()
+    
+    def close(self):
+        for pool in self._pools.values():
+            pool.close()
+        self._pools.clear()
+        # Pools and the limit belong to the crawl's event loop
+        self._limit = None
+
+
+def response_document(response):
+    """A 200 response as a tracker document ('page_offsets' too for PDFs)"""
+    path = urlsplit(response.url).path
+    name = os.path.splitext(unquote(os.path.basename(path.rstrip('/'))))[0] or path
+    try:
+        date = parsedate_to_datetime(response.headers['last-modified']).strftime('%Y-%m-%d')
+    except (KeyError, TypeError, ValueError):
+        date = datetime.now().strftime('%Y-%m-%d')
+    
+    if (path.lower().endswith('.pdf')
+            or response.headers.get('content-type', '').startswith('application/pdf')):
+        from PyPDF2 import PdfReader
+        from pdf_ingestion import join_pages
+        reader = PdfReader(io.BytesIO(response.body))
+        text, offsets = join_pages([page.extract_text() or '' for page in reader.pages])
+        return {'text': text, 'name': name, 'date': date, 'page_offsets': offsets}
+    return {'text': response.text(), 'name': name, 'date': date}
+
+
+class FetchCache:
+    """
+    SQLite store of fetched documents and their validators (ETag and
+    Last-Modified), so later crawls can send conditional requests
+    """
+    
+    def __init__(self, path='portal_fetch_cache.sqlite'):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS documents (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                document TEXT NOT NULL
+            )
+        ''')
+        self._lock = threading.Lock()
+    
+    def lookup(self, url):
+        """(etag, last_modified, document) stored for a URL, or None"""
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT etag, last_modified, document FROM documents WHERE url = ?', (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2])
+    
+    def store(self, url, etag, last_modified, document):
+        with self._lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO documents (url, etag, last_modified, document) '
+                'VALUES (?, ?, ?, ?)',
+                (url, etag, last_modified, json.dumps(document))
+            )
+            self.conn.commit()
+    
+    def close(self):
+        with self._lock:
+            self.conn.commit()
+            self.conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_portal_documents(index_url, fetcher=None, max_depth=2, changed_only=False,
+                          prefetch=32, **options):
+    """
+    Yield tracker documents from a portal crawl, as they arrive
+    
+    The crawl runs on its own thread and event loop, so the result can be
+    passed straight to analyze_documents / analyze_documents_stream. Stopping
+    early (closing the generator) cancels the crawl. Options are passed to
+    PortalFetcher when no fetcher is given.
+    """
+    if fetcher is None:
+        fetcher = PortalFetcher(**options)
+    handoff = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+    done = object()
+    
+    def put(item):
+        while not stop.is_set():
+            try:
+                handoff.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    async def produce():
+        async for document in fetcher.crawl(index_url, max_depth, changed_only, prefetch):
+            # Off the event loop, so fetches continue while the consumer is busy
+            if not await asyncio.to_thread(put, document):
+                break
+    
+    def run():
+        try:
+            asyncio.run(produce())
+        except BaseException as e:
+            put(e)
+        else:
+            put(done)
+    
+    thread = threading.Thread(target=run, name='portal-fetcher', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = handoff.get()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+class MirrorHandler(SimpleHTTPRequestHandler):
+    """
+    Static handler for a mirrored portal folder, speaking keep-alive HTTP/1.1
+    with ETag and Last-Modified validators (a stand-in for the real portal)
+    """
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def _etag(self):
+        try:
+            stat = os.stat(self.translate_path(self.path))
+        except OSError:
+            return None
+        return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    
+    def send_head(self):
+        etag = self._etag()
+        if etag is not None and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return None
+        return super().send_head()
+    
+    def send_response(self, code, message=None):
+        super().send_response(code, message)
+        if code == 200:
+            etag = self._etag()
+            if etag is not None and os.path.isfile(self.translate_path(self.path)):
+                self.send_header('ETag', etag)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_mirror(directory, host='127.0.0.1', port=8000):
+    """ThreadingHTTPServer serving a mirrored portal folder (call serve_forever())"""
+    return ThreadingHTTPServer((host, port), partial(MirrorHandler, directory=directory))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fetch and analyze planning-portal documents')
+    parser.add_argument('index_url', nargs='?', help='portal index page to crawl')
+    parser.add_argument('--depth', type=int, default=2, help='index pages followed this deep')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--connections', type=int, default=4, help='keep-alive connections per host')
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('--cache', default='portal_fetch_cache.sqlite',
+                        help='validator store for conditional requests')
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--gazetteer', help='gazetteer JSON/CSV of known corridor names')
+    parser.add_argument('--serve-mirror', metavar='DIR',
+                        help='serve a mirrored portal folder instead of crawling')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+    
+    if args.serve_mirror:
+        server = serve_mirror(args.serve_mirror, args.host, args.port)
+        print(f"Serving {args.serve_mirror} on http://{args.host}:{args.port}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return
+    if not args.index_url:
+        parser.error('an index URL (or --serve-mirror) is required')
+    
+    from municipal_rezoning_tracker import MunicipalRezoningTracker
+    gazetteer = None
+    if args.gazetteer:
+        from corridor_gazetteer import CorridorGazetteer
+        gazetteer = CorridorGazetteer.load(args.gazetteer)
+    tracker = MunicipalRezoningTracker(gazetteer=gazetteer)
+    
+    with FetchCache(args.cache) as cache:
+        fetcher = PortalFetcher(concurrency=args.concurrency, connections_per_host=args.connections,
+                                retries=args.retries, cache=cache)
+        ranked = tracker.analyze_documents(
+            iter_portal_documents(args.index_url, fetcher, max_depth=args.depth), top_n=args.top
+        )
+    print(tracker.generate_report(ranked, top_n=args.top))
+    print(f"Fetch: {fetcher.counts}")
+    for error in fetcher.errors:
+        print(f"  failed {error['url']}: {error['error']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Result Cache
+------------
+On-disk cache of per-document analysis results, so nightly reruns only
+analyze documents that are new or have changed.
+
+Entries are keyed by a hash of the document text plus the tracker's
+configuration fingerprint. Changing intent_keywords, keyword_weights or
+corridor_patterns therefore misses every old entry automatically, and the
+stale rows age out through size-based LRU eviction.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+class ResultCache:
+    """
+    SQLite-backed cache of analyze_document outputs
+    
+    One cache can be shared by several threads (e.g. the handler threads of
+    rezoning_service); every use of the connection is serialized by a lock.
+    
+    Usage:
+        with ResultCache('rezoning_cache.sqlite') as cache:
+            opportunities = tracker.analyze_documents(documents, cache=cache)
+    """
+    
+    def __init__(self, path='rezoning_cache.sqlite', max_bytes=256 * 1024 * 1024,
+                 commit_every=500):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.commit_every = commit_every
+        self.hits = 0
+        self.misses = 0
+        self._pending = 0
+        self._lock = threading.RLock()
+        
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)')
+        self.total_bytes = self.conn.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM results'
+        ).fetchone()[0]
+    
+    @staticmethod
+    def key(text, fingerprint, page_offsets=None, include_details=False):
+        """Cache key for a document's text under a tracker configuration"""
+        digest = hashlib.sha256(fingerprint.encode('utf-8'))
+        if page_offsets:
+            # Page numbers are part of the cached output
+            digest.update(json.dumps(list(page_offsets)).encode('utf-8'))
+        if include_details:
+            digest.update(b'\0details')
+        digest.update(b'\0')
+        digest.update(text.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+    
+    def get(self, key):
+        """Cached opportunity list for a key, or None"""
+        with self._lock:
+            row = self.conn.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+            self.conn.execute('UPDATE results SET last_used = ? WHERE key = ?', (time.time(), key))
+            self._written()
+        return json.loads(row[0])
+    
+    def put(self, key, opportunities):
+        """Store one document's opportunity list"""
+        value = json.dumps(opportunities)
+        size = len(value)
+        with self._lock:
+            old = self.conn.execute('SELECT size FROM results WHERE key = ?', (key,)).fetchone()
+            if old is not None:
+                self.total_bytes -= old[0]
+            
+            self.conn.execute(
+                'INSERT OR REPLACE INTO results (key, value, size, last_used) VALUES (?, ?, ?, ?)',
+                (key, value, size, time.time())
+            )
+            self.total_bytes += size
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+            self._written()
+    
+    def evict(self, target_bytes=None):
+        """Drop least recently used entries until the cache fits in target_bytes"""
+        if target_bytes is None:
+            # Free a little extra so eviction doesn't run on every insert
+            target_bytes = int(self.max_bytes * 0.9)
+        
+        with self._lock:
+            rows = self.conn.execute('SELECT key, size FROM results ORDER BY last_used')
+            doomed = []
+            for key, size in rows:
+                if self.total_bytes <= target_bytes:
+                    break
+                doomed.append((key,))
+                self.total_bytes -= size
+            rows.close()
+            
+            self.conn.executemany('DELETE FROM results WHERE key = ?', doomed)
+        return len(doomed)
+    
+    def _written(self):
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.conn.commit()
+            self._pending = 0
+    
+    def close(self):
+        with self._lock:
+            self.conn.commit()
+            self.conn.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
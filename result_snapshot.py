@@ -0,0 +1,359 @@
+"""
+Result Snapshot
+---------------
+Columnar, memory-mappable snapshots of ranked opportunities
+
+Dashboards that reload the JSON or CSV exports spend most of their time
+parsing the nested documents and evidence lists. A snapshot stores each
+field as its own column file instead:
+
+- numbers are NumPy .npy arrays, opened with mmap_mode='r'
+- strings are one UTF-8 blob plus an int64 offsets array, decoded only
+  when a value is read
+- timelines are small integer codes with the category names kept in the
+  manifest
+
+A reader maps just the columns it asks for and copies no data up front.
+
+Each analysis run is appended as a new run-NNNNNN folder. The manifest is
+then replaced atomically, so earlier runs are never rewritten, and a
+reader never sees a half-written run. There is one writer at a time.
+
+Tables in each run:
+    opportunities  corridor, total_score, avg_score, num_mentions, timeline,
+                   documents_start/stop (rows of mentions), evidence_start/stop
+    documents      name, date (one row per distinct document)
+    mentions       opportunity, document, score (one row per corridor/document)
+    evidence       opportunity, quote
+    
+    snapshot = ResultSnapshot('rezoning_snapshots')
+    snapshot.append(ranked, label='2024-10 council cycle')
+    run = snapshot.run()                                   # latest run
+    scores = run.column('opportunities', 'total_score')    # mmap'd ndarray
+    names = run.column('opportunities', 'corridor')        # lazily decoded strings
+"""
+
+import json
+import os
+import re
+import shutil
+from datetime import datetime
+
+import numpy as np
+
+from municipal_rezoning_tracker import ANALYSIS_VERSION
+
+FORMAT = 'rezoning-snapshot'
+FORMAT_VERSION = 1
+MANIFEST = 'manifest.json'
+RUN_FOLDER = re.compile(r'run-\d{6}')
+
+
+class StringColumn:
+    """
+    A string column over a memory-mapped UTF-8 blob; values are decoded one
+    at a time on access, or all at once with tolist()
+    """
+    
+    def __init__(self, blob, offsets, valid=None):
+        self.blob = blob
+        self.offsets = offsets
+        self.valid = valid
+    
+    def __len__(self):
+        return len(self.offsets) - 1
+    
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        if self.valid is not None and not self.valid[i]:
+            return None
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode('utf-8')
+    
+    def __iter__(self):
+        return iter(self.tolist())
+    
+    def tolist(self):
+        data = bytes(self.blob)
+        text = data.decode('utf-8')
+        bounds = self.offsets.tolist()
+        if len(text) == len(data):
+            # ASCII: byte offsets are character offsets, so slice the decoded text
+            values = [text[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+        else:
+            values = [data[bounds[i]:bounds[i + 1]].decode('utf-8') for i in range(len(bounds) - 1)]
+        if self.valid is not None:
+            values = [value if ok else None for value, ok in zip(values, self.valid.tolist())]
+        return values
+
+
+class CategoryColumn:
+    """Integer codes into a short list of category names"""
+    
+    def __init__(self, codes, categories):
+        self.codes = codes
+        self.categories = categories
+    
+    def __len__(self):
+        return len(self.codes)
+    
+    def __getitem__(self, i):
+        return self.categories[self.codes[i]]
+    
+    def __iter__(self):
+        return iter(self.tolist())
+    
+    def tolist(self):
+        return [self.categories[code] for code in self.codes.tolist()]
+
+
+def _write_numeric(folder, name, values, dtype):
+    array = np.asarray(values) if values else np.zeros(0, dtype=dtype)
+    if array.dtype == object or array.dtype.kind not in 'biuf':
+        array = np.asarray(values, dtype=np.float64)
+    np.save(os.path.join(folder, name + '.npy'), array)
+    return {'type': 'numeric', 'dtype': array.dtype.str}
+
+
+def _write_string(folder, name, values):
+    encoded = [b'' if value is None else value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    with open(os.path.join(folder, name + '.bytes'), 'wb') as f:
+        f.write(b''.join(encoded))
+    np.save(os.path.join(folder, name + '.offsets.npy'), offsets)
+    spec = {'type': 'string'}
+    if any(value is None for value in values):
+        np.save(os.path.join(folder, name + '.valid.npy'),
+                np.array([value is not None for value in values], dtype=bool))
+        spec['nullable'] = True
+    return spec
+
+
+def _write_category(folder, name, values):
+    categories = sorted(set(values), key=str)
+    lookup = {category: code for code, category in enumerate(categories)}
+    np.save(os.path.join(folder, name + '.npy'),
+            np.array([lookup[value] for value in values], dtype=np.int16))
+    return {'type': 'category', 'categories': categories}
+
+
+class SnapshotRun:
+    """One appended run; columns are mapped on first access and kept"""
+    
+    def __init__(self, folder, entry):
+        self.folder = folder
+        self.entry = entry
+        self.id = entry['id']
+        self.label = entry.get('label')
+        self.tables = entry['tables']
+        self._columns = {}
+    
+    def rows(self, table):
+        return self.tables[table]['rows']
+    
+    def column(self, table, name):
+        """A column as a read-only memory-mapped ndarray, StringColumn or CategoryColumn"""
+        key = (table, name)
+        if key not in self._columns:
+            spec = self.tables[table]['columns'][name]
+            base = os.path.join(self.folder, f'{table}.{name}')
+            if spec['type'] == 'numeric':
+                column = np.load(base + '.npy', mmap_mode='r')
+            elif spec['type'] == 'category':
+                column = CategoryColumn(np.load(base + '.npy', mmap_mode='r'), spec['categories'])
+            else:
+                offsets = np.load(base + '.offsets.npy', mmap_mode='r')
+                # mmap cannot map an empty file
+                if offsets[-1]:
+                    blob = np.memmap(base + '.bytes', dtype=np.uint8, mode='r')
+                else:
+                    blob = np.zeros(0, dtype=np.uint8)
+                valid = (np.load(base + '.valid.npy', mmap_mode='r')
+                         if spec.get('nullable') else None)
+                column = StringColumn(blob, offsets, valid)
+            self._columns[key] = column
+        return self._columns[key]
+    
+    def table(self, table, columns=None):
+        """Dict of column name -> column, for just the columns asked for"""
+        names = columns if columns is not None else list(self.tables[table]['columns'])
+        return {name: self.column(table, name) for name in names}
+    
+    def documents_for(self, row):
+        """(name, date, score) of each document behind one opportunity row"""
+        start = int(self.column('opportunities', 'documents_start')[row])
+        stop = int(self.column('opportunities', 'documents_stop')[row])
+        documents = self.column('mentions', 'document')[start:stop]
+        scores = self.column('mentions', 'score')[start:stop]
+        names = self.column('documents', 'name')
+        dates = self.column('documents', 'date')
+        return [(names[d], dates[d], score) for d, score in zip(documents.tolist(), scores.tolist())]
+    
+    def ranked(self):
+        """The run as analyze_documents-style opportunity dicts (reads every column)"""
+        opportunities = self.table('opportunities')
+        names = self.column('documents', 'name').tolist()
+        dates = self.column('documents', 'date').tolist()
+        mention_documents = self.column('mentions', 'document').tolist()
+        mention_scores = self.column('mentions', 'score').tolist()
+        quotes = self.column('evidence', 'quote').tolist()
+        columns = {name: column.tolist() for name, column in opportunities.items()}
+        
+        ranked = []
+        for i in range(self.rows('opportunities')):
+            documents = range(columns['documents_start'][i], columns['documents_stop'][i])
+            ranked.append({
+                'corridor': columns['corridor'][i],
+                'total_score': columns['total_score'][i],
+                'avg_score': columns['avg_score'][i],
+                'num_mentions': columns['num_mentions'][i],
+                'timeline': columns['timeline'][i],
+                'documents': [
+                    {'name': names[mention_documents[m]], 'date': dates[mention_documents[m]],
+                     'score': mention_scores[m]}
+                    for m in documents
+                ],
+                'evidence': quotes[columns['evidence_start'][i]:columns['evidence_stop'][i]]
+            })
+        return ranked
+
+
+class ResultSnapshot:
+    """
+    Append-only folder of snapshot runs
+    
+    Args:
+        path: Snapshot folder (created on first append)
+    """
+    
+    def __init__(self, path='rezoning_snapshots'):
+        self.path = path
+        self.refresh()
+    
+    def refresh(self):
+        """Re-read the manifest (to see runs another process appended)"""
+        try:
+            with open(os.path.join(self.path, MANIFEST)) as f:
+                self.manifest = json.load(f)
+        except FileNotFoundError:
+            self.manifest = {'format': FORMAT, 'version': FORMAT_VERSION, 'runs': []}
+        if self.manifest.get('format') != FORMAT or self.manifest.get('version') != FORMAT_VERSION:
+            raise ValueError(f'{self.path} is not a version {FORMAT_VERSION} {FORMAT}')
+    
+    @property
+    def runs(self):
+        return self.manifest['runs']
+    
+    def __len__(self):
+        return len(self.runs)
+    
+    def run(self, index=-1):
+        """A run by position (default: the latest) or by id"""
+        if isinstance(index, str):
+            entries = [entry for entry in self.runs if entry['id'] == index]
+            if not entries:
+                raise KeyError(index)
+            entry = entries[0]
+        else:
+            entry = self.runs[index]
+        return SnapshotRun(os.path.join(self.path, entry['id']), entry)
+    
+    def append(self, ranked_opportunities, label=None):
+        """Write ranked opportunities as a new run; returns its id"""
+        os.makedirs(self.path, exist_ok=True)
+        self.refresh()
+        run_id = f'run-{self._next_run_number():06d}'
+        staging = os.path.join(self.path, run_id + '.tmp')
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        
+        tables = self._write_run(staging, ranked_opportunities)
+        os.replace(staging, os.path.join(self.path, run_id))
+        
+        entry = {
+            'id': run_id,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'label': label,
+            'analysis_version': ANALYSIS_VERSION,
+            'tables': tables
+        }
+        manifest = dict(self.manifest, runs=self.runs + [entry])
+        temporary = os.path.join(self.path, MANIFEST + '.tmp')
+        with open(temporary, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temporary, os.path.join(self.path, MANIFEST))
+        self.manifest = manifest
+        return run_id
+    
+    def _next_run_number(self):
+        """
+        One past the highest run number in the manifest or on disk. A crash
+        between moving a run into place and rewriting the manifest leaves
+        an orphan run folder, whose id must not be reused
+        """
+        numbers = [int(entry['id'][len('run-'):]) for entry in self.runs]
+        numbers += [int(name[len('run-'):]) for name in os.listdir(self.path)
+                    if RUN_FOLDER.fullmatch(name)]
+        return max(numbers, default=-1) + 1
+    
+    @staticmethod
+    def _write_run(folder, ranked_opportunities):
+        opportunities = {name: [] for name in (
+            'corridor', 'total_score', 'avg_score', 'num_mentions', 'timeline',
+            'documents_start', 'documents_stop', 'evidence_start', 'evidence_stop'
+        )}
+        document_rows = {}
+        mentions = {'opportunity': [], 'document': [], 'score': []}
+        quotes = {'opportunity': [], 'quote': []}
+        
+        for row, opp in enumerate(ranked_opportunities):
+            opportunities['corridor'].append(opp['corridor'])
+            opportunities['total_score'].append(opp['total_score'])
+            opportunities['avg_score'].append(opp['avg_score'])
+            opportunities['num_mentions'].append(opp['num_mentions'])
+            opportunities['timeline'].append(opp['timeline'])
+            
+            opportunities['documents_start'].append(len(mentions['opportunity']))
+            for doc in opp.get('documents', []):
+                key = (doc['name'], doc['date'])
+                if key not in document_rows:
+                    document_rows[key] = len(document_rows)
+                mentions['opportunity'].append(row)
+                mentions['document'].append(document_rows[key])
+                mentions['score'].append(doc['score'])
+            opportunities['documents_stop'].append(len(mentions['opportunity']))
+            
+            opportunities['evidence_start'].append(len(quotes['opportunity']))
+            for quote in opp.get('evidence', []):
+                quotes['opportunity'].append(row)
+                quotes['quote'].append(quote)
+            opportunities['evidence_stop'].append(len(quotes['opportunity']))
+        
+        def table(name, columns, kinds):
+            specs = {}
+            for column, values in columns.items():
+                kind = kinds.get(column, np.int64)
+                path_name = f'{name}.{column}'
+                if kind == 'string':
+                    specs[column] = _write_string(folder, path_name, values)
+                elif kind == 'category':
+                    specs[column] = _write_category(folder, path_name, values)
+                else:
+                    specs[column] = _write_numeric(folder, path_name, values, kind)
+            rows = len(next(iter(columns.values())))
+            return {'rows': rows, 'columns': specs}
+        
+        documents = {'name': [name for name, _ in document_rows],
+                     'date': [date for _, date in document_rows]}
+        return {
+            'opportunities': table('opportunities', opportunities, {
+                'corridor': 'string', 'timeline': 'category',
+                'total_score': np.float64, 'avg_score': np.float64
+            }),
+            'documents': table('documents', documents, {'name': 'string', 'date': 'string'}),
+            'mentions': table('mentions', mentions, {'score': np.float64}),
+            'evidence': table('evidence', quotes, {'quote': 'string'})
+        }
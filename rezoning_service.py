@@ -0,0 +1,255 @@
+"""
+Rezoning Service
+----------------
+Long-running local HTTP service over one analyzed corpus
+
+The corpus is analyzed once at start-up. New documents are analyzed as they
+are posted and folded into the running totals, so nothing is recomputed and
+the service never needs a restart. Every change bumps the corpus version.
+Responses are cached in an LRU keyed by (corpus version, path, query), which
+means a stale answer can never be served.
+
+    python rezoning_service.py --port 8765 --gazetteer charlotte_gazetteer.json
+
+Endpoints (all JSON):
+    GET  /opportunities?limit=50&cursor=...   Ranked corridors, paginated
+    GET  /opportunities?top_n=10              Top corridors only
+    GET  /report?top_n=10                     generate_report text
+    GET  /corridors/<name>                    One corridor's detail
+    GET  /status                              Corpus version and size
+    POST /documents                           Analyze and add documents
+                                              (one {"text", "name", "date"}
+                                              object or a list of them)
+"""
+
+import argparse
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from municipal_rezoning_tracker import CorridorAggregator, MunicipalRezoningTracker
+
+
+class ResponseCache:
+    """Thread-safe LRU of encoded responses"""
+    
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            body = self.entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return body
+    
+    def put(self, key, body):
+        with self._lock:
+            self.entries[key] = body
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+    
+    def drop_versions_before(self, version):
+        """Free entries of older corpus versions (they can never hit again)"""
+        with self._lock:
+            for key in [key for key in self.entries if key[0] < version]:
+                del self.entries[key]
+
+
+class RezoningService:
+    """
+    A tracker plus the running aggregate of every document it has seen
+    
+    Args:
+        tracker: Configured MunicipalRezoningTracker
+        workers: Processes used when analyzing posted or initial documents
+        cache: Optional ResultCache for per-document results
+        max_cached_responses: Size of the response LRU
+    """
+    
+    def __init__(self, tracker=None, workers=None, cache=None, max_cached_responses=1024):
+        self.tracker = tracker or MunicipalRezoningTracker()
+        self.workers = workers
+        self.cache = cache
+        self.aggregator = CorridorAggregator()
+        self.version = 0
+        self.responses = ResponseCache(max_cached_responses)
+        self._lock = threading.Lock()
+    
+    def add_documents(self, documents):
+        """Analyze documents and fold them in; returns the new corpus version"""
+        # Analysis runs outside the lock so queries keep being served meanwhile
+        results = list(self.tracker.iter_document_opportunities(
+            documents, self.workers, cache=self.cache
+        ))
+        with self._lock:
+            for opportunities in results:
+                self.aggregator.add(opportunities)
+            self.version += 1
+            version = self.version
+        self.responses.drop_versions_before(version)
+        return version
+    
+    def status(self):
+        return {
+            'version': self.version,
+            'documents': self.aggregator.documents_seen,
+            'corridors': len(self.aggregator.corridors),
+            'cached_responses': len(self.responses.entries),
+            'cache_hits': self.responses.hits,
+            'cache_misses': self.responses.misses
+        }
+    
+    def query(self, path, params):
+        """
+        Answer a GET as (status, encoded JSON body), from the LRU when possible
+        params maps query names to single values
+        """
+        if path == '/status':
+            return 200, json.dumps(self.status()).encode('utf-8')
+        
+        with self._lock:
+            version = self.version
+            key = (version, path, tuple(sorted(params.items())))
+            body = self.responses.get(key)
+            if body is not None:
+                return 200, body
+            status, result = self._answer(path, params)
+        
+        body = json.dumps(result).encode('utf-8')
+        if status == 200:
+            self.responses.put(key, body)
+        return status, body
+    
+    def _answer(self, path, params):
+        """Uncached answer; called with the lock held"""
+        try:
+            if path == '/opportunities':
+                if 'top_n' in params:
+                    return 200, {'version': self.version,
+                                 'opportunities': self.aggregator.top(int(params['top_n']))}
+                limit = int(params.get('limit', 50))
+                if limit < 1:
+                    raise ValueError('limit must be at least 1')
+                items, cursor = self.aggregator.page(limit, params.get('cursor'))
+                return 200, {'version': self.version, 'opportunities': items,
+                             'next_cursor': cursor}
+            
+            if path == '/report':
+                top_n = int(params.get('top_n', 10))
+                report = self.tracker.generate_report(self.aggregator.top(top_n), top_n=top_n)
+                return 200, {'version': self.version, 'report': report}
+            
+            if path.startswith('/corridors/'):
+                corridor = unquote(path[len('/corridors/'):])
+                opportunity = self.aggregator.opportunity(corridor)
+                if opportunity is None:
+                    return 404, {'error': f'unknown corridor: {corridor}'}
+                return 200, {'version': self.version, 'opportunity': opportunity}
+        except (ValueError, TypeError) as e:
+            return 400, {'error': str(e)}
+        
+        return 404, {'error': f'unknown path: {path}'}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Set on the subclass made by make_server
+    service = None
+    
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        self._send(*self.service.query(url.path, params))
+    
+    def do_POST(self):
+        if urlsplit(self.path).path != '/documents':
+            self._send(404, json.dumps({'error': 'unknown path'}).encode('utf-8'))
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            documents = json.loads(self.rfile.read(length))
+            if isinstance(documents, dict):
+                documents = [documents]
+            if not isinstance(documents, list):
+                raise ValueError('expected a document object or a list of them')
+            for doc in documents:
+                if not isinstance(doc, dict) or not all(key in doc for key in ('text', 'name', 'date')):
+                    raise ValueError("documents need 'text', 'name' and 'date'")
+                if not isinstance(doc['text'], str) or not isinstance(doc['name'], str):
+                    raise ValueError("document 'text' and 'name' must be strings")
+        except ValueError as e:
+            self._send(400, json.dumps({'error': str(e)}).encode('utf-8'))
+            return
+        
+        try:
+            version = self.service.add_documents(documents)
+        except Exception as e:
+            # Nothing was folded in (results are only added once all are analyzed)
+            self._send(500, json.dumps({'error': f'analysis failed: {e}'}).encode('utf-8'))
+            return
+        self._send(200, json.dumps({'version': version, 'added': len(documents)}).encode('utf-8'))
+    
+    def log_message(self, format, *args):
+        # Quiet by default; the dashboard polls often
+        pass
+
+
+def make_server(service, host='127.0.0.1', port=8765):
+    """ThreadingHTTPServer bound to a RezoningService (call serve_forever())"""
+    handler = type('RezoningHandler', (_Handler,), {'service': service})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve rezoning opportunities over HTTP')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--pdf-dir', help='load the corpus from a folder of PDFs')
+    parser.add_argument('--gazetteer', help='gazetteer JSON/CSV of known corridor names')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+    
+    gazetteer = None
+    if args.gazetteer:
+        from corridor_gazetteer import CorridorGazetteer
+        gazetteer = CorridorGazetteer.load(args.gazetteer)
+    service = RezoningService(MunicipalRezoningTracker(gazetteer=gazetteer), workers=args.workers)
+    
+    if args.pdf_dir:
+        from pdf_ingestion import iter_pdf_documents
+        documents = iter_pdf_documents(args.pdf_dir, workers=args.workers)
+    else:
+        from sample_planning_documents import get_sample_documents
+        documents = get_sample_documents()
+    service.add_documents(documents)
+    
+    server = make_server(service, args.host, args.port)
+    print(f"Serving {service.aggregator.documents_seen} documents on "
+          f"http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Tracker Stats
+-------------
+Optional hot-path instrumentation for MunicipalRezoningTracker
+
+Attach a TrackerStats to a tracker to see where a slow run spends its
+time: per-stage wall time, call counts and bytes scanned, per-document
+timings, and the slowest documents and corridors. With no stats attached
+the tracker only pays for a few `is None` checks.
+
+    stats = TrackerStats(flag_seconds=2.0)
+    tracker = MunicipalRezoningTracker(stats=stats)
+    tracker.analyze_documents(documents)
+    stats.dump('run_stats.json')
+"""
+
+import heapq
+import json
+from time import perf_counter
+
+
+class TrackerStats:
+    """
+    Per-stage counters plus the slowest documents and corridors
+    
+    Args:
+        slowest: How many of the slowest documents/corridors to keep
+        flag_seconds: Documents taking longer than this are listed as flagged
+        on_document: Optional callback(record) called after every document,
+            with a dict of name, seconds, bytes and corridors
+    """
+    
+    def __init__(self, slowest=10, flag_seconds=None, on_document=None):
+        self.slowest = slowest
+        self.flag_seconds = flag_seconds
+        self.on_document = on_document
+        # Worker copies (see fresh) log every document so merge() can replay them
+        self._logs_documents = False
+        self.reset()
+    
+    def reset(self):
+        # stage -> [calls, seconds, bytes]
+        self.stages = {}
+        self.documents = 0
+        self.document_seconds = 0.0
+        self.document_bytes = 0
+        self.flagged = []
+        # Work the tracker's prefilter proved unnecessary
+        self.prefilter = {'documents': 0, 'corridors': 0, 'bytes': 0}
+        # Min-heaps of (seconds, ...) so the fastest entry is dropped first
+        self._slow_documents = []
+        self._slow_corridors = []
+        # Every (seconds, name, bytes, corridors) recorded, if logging
+        self._document_log = [] if self._logs_documents else None
+    
+    @staticmethod
+    def clock():
+        return perf_counter()
+    
+    def record(self, stage, seconds, nbytes=0, calls=1):
+        counters = self.stages.get(stage)
+        if counters is None:
+            counters = self.stages[stage] = [0, 0.0, 0]
+        counters[0] += calls
+        counters[1] += seconds
+        counters[2] += nbytes
+    
+    def lap(self, stage, mark, nbytes=0):
+        """Record the time since mark against a stage; returns the new mark"""
+        now = perf_counter()
+        self.record(stage, now - mark, nbytes)
+        return now
+    
+    def record_prefilter(self, corridors, nbytes, document=False):
+        """
+        Corridors dropped before their mentions were scanned; nbytes is the
+        text a skipped document (document=True) was never scanned over
+        """
+        self.prefilter['corridors'] += corridors
+        self.prefilter['bytes'] += nbytes
+        self.prefilter['documents'] += document
+    
+    def record_corridor(self, document, corridor, seconds, mentions):
+        self._keep(self._slow_corridors, (seconds, document, corridor, mentions))
+    
+    def record_document(self, name, seconds, nbytes, corridors):
+        self.documents += 1
+        self.document_seconds += seconds
+        self.document_bytes += nbytes
+        self._keep(self._slow_documents, (seconds, name, nbytes, corridors))
+        if self._document_log is not None:
+            self._document_log.append((seconds, name, nbytes, corridors))
+        
+        record = {'name': name, 'seconds': seconds, 'bytes': nbytes, 'corridors': corridors}
+        if self.flag_seconds is not None and seconds > self.flag_seconds:
+            self.flagged.append(record)
+        if self.on_document is not None:
+            self.on_document(record)
+    
+    def _keep(self, heap, item):
+        if self.slowest <= 0:
+            return
+        if len(heap) < self.slowest:
+            heapq.heappush(heap, item)
+        elif item[0] > heap[0][0]:
+            heapq.heapreplace(heap, item)
+    
+    def fresh(self):
+        """Empty stats with the same settings (used for worker processes)"""
+        stats = TrackerStats(self.slowest, self.flag_seconds)
+        stats._logs_documents = True
+        stats.reset()
+        return stats
+    
+    def merge(self, other):
+        """Fold in stats collected elsewhere, e.g. by a worker process"""
+        for stage, (calls, seconds, nbytes) in other.stages.items():
+            self.record(stage, seconds, nbytes, calls)
+        for key, value in other.prefilter.items():
+            self.prefilter[key] += value
+        for item in other._slow_corridors:
+            self._keep(self._slow_corridors, item)
+        # Not the slowest heap: it holds nothing when slowest=0
+        for seconds, name, nbytes, corridors in other._document_log or ():
+            self.record_document(name, seconds, nbytes, corridors)
+    
+    def to_dict(self):
+        stages = {}
+        for stage, (calls, seconds, nbytes) in sorted(self.stages.items(),
+                                                      key=lambda item: -item[1][1]):
+            stages[stage] = {
+                'calls': calls,
+                'seconds': round(seconds, 6),
+                'bytes': nbytes,
+                'mb_per_sec': round(nbytes / 1e6 / seconds, 2) if seconds and nbytes else None
+            }
+        return {
+            'documents': self.documents,
+            'document_seconds': round(self.document_seconds, 6),
+            'document_bytes': self.document_bytes,
+            'stages': stages,
+            'prefilter_skipped': dict(self.prefilter),
+            'slowest_documents': [
+                {'name': name, 'seconds': round(seconds, 6), 'bytes': nbytes, 'corridors': corridors}
+                for seconds, name, nbytes, corridors in sorted(self._slow_documents, reverse=True)
+            ],
+            'slowest_corridors': [
+                {'document': document, 'corridor': corridor, 'seconds': round(seconds, 6),
+                 'mentions': mentions}
+                for seconds, document, corridor, mentions in sorted(self._slow_corridors, reverse=True)
+            ],
+            'flagged_documents': self.flagged
+        }
+    
+    def dump(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+    
+    def __getstate__(self):
+        # Callbacks stay in the parent process
+        state = self.__dict__.copy()
+        state['on_document'] = None
+        return state